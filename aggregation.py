@@ -0,0 +1,97 @@
+"""
+Vectorized NumPy aggregation of forecast slots into local calendar days
+"""
+
+import time
+
+import numpy as np
+
+SECONDS_PER_DAY = 86400
+
+
+def local_utc_offset(timestamp: float = None) -> int:
+    """UTC offset (seconds) of this machine's local time at ``timestamp``"""
+    local = time.localtime(timestamp)
+    return local.tm_gmtoff or 0
+
+
+def group_by_local_day(timestamps: np.ndarray, utc_offset: int = 0):
+    """
+    Sort slots into local days.
+
+    Returns ``(order, starts, days)``: ``order`` sorts the slots by day
+    (stable, so time order is kept within a day), ``starts`` indexes the
+    first sorted slot of each day and ``days`` holds the local day numbers.
+    """
+    local_days = (np.asarray(timestamps, dtype=np.int64) + utc_offset) // SECONDS_PER_DAY
+    order = np.argsort(local_days, kind="stable")
+    sorted_days = local_days[order]
+    boundaries = np.empty(len(sorted_days), dtype=bool)
+    boundaries[:1] = True
+    np.not_equal(sorted_days[1:], sorted_days[:-1], out=boundaries[1:])
+    starts = np.flatnonzero(boundaries)
+    return order, starts, sorted_days[starts]
+
+
+def aggregate_daily(timestamps, temp_max, temp_min, precipitation, humidity, wind_speed,
+                    conditions, utc_offset: int = 0) -> dict:
+    """
+    Collapse per-slot arrays into one row per local day in a single pass.
+
+    Every input is a 1-D array-like of equal length. Returns arrays of
+    length ``n_days``: the true ``high``/``low`` over all slots, summed
+    ``precipitation``, mean ``humidity``, max ``wind_speed``, the
+    ``condition`` seen in most slots (ties go to the condition that
+    appears first in the input), ``representative`` (index of the first
+    input slot with that condition, for icon/description lookups),
+    ``first_timestamp`` and ``slots`` per day.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    n = len(timestamps)
+    if n == 0:
+        empty = np.empty(0)
+        return {"day": np.empty(0, dtype=np.int64), "first_timestamp": np.empty(0, dtype=np.int64),
+                "high": empty, "low": empty, "precipitation": empty, "humidity": empty,
+                "wind_speed": empty, "condition": np.empty(0, dtype=object),
+                "representative": np.empty(0, dtype=np.int64), "slots": np.empty(0, dtype=np.int64)}
+
+    order, starts, days = group_by_local_day(timestamps, utc_offset)
+    counts = np.diff(np.append(starts, n))
+
+    def sorted_values(values):
+        return np.asarray(values, dtype=np.float64)[order]
+
+    high = np.maximum.reduceat(sorted_values(temp_max), starts)
+    low = np.minimum.reduceat(sorted_values(temp_min), starts)
+    total_precipitation = np.add.reduceat(sorted_values(precipitation), starts)
+    mean_humidity = np.add.reduceat(sorted_values(humidity), starts) / counts
+    max_wind = np.maximum.reduceat(sorted_values(wind_speed), starts)
+
+    # Dominant condition: label codes ranked by first appearance, then a
+    # (day, code) histogram; argmax picks the lowest rank on ties
+    labels, first_seen, codes = np.unique(np.asarray(conditions), return_index=True,
+                                          return_inverse=True)
+    by_appearance = np.argsort(first_seen)
+    rank = np.empty_like(by_appearance)
+    rank[by_appearance] = np.arange(len(by_appearance))
+    sorted_codes = rank[codes.reshape(-1)][order]
+    n_days, n_labels = len(starts), len(labels)
+    day_index = np.repeat(np.arange(n_days), counts)
+    tally = np.bincount(day_index * n_labels + sorted_codes, minlength=n_days * n_labels)
+    dominant = tally.reshape(n_days, n_labels).argmax(axis=1)
+
+    positions = np.where(sorted_codes == dominant[day_index], np.arange(n), n)
+    representative = order[np.minimum.reduceat(positions, starts)]
+
+    return {
+        "day": days,
+        "first_timestamp": timestamps[order[starts]],
+        "high": high,
+        "low": low,
+        "precipitation": total_precipitation,
+        "humidity": mean_humidity,
+        "wind_speed": max_wind,
+        "condition": labels[by_appearance][dominant],
+        "representative": representative,
+        "slots": counts,
+    }
@@ -1,9 +1,14 @@
 import streamlit as st
 import requests
-import pandas as pd
-from datetime import datetime
-import plotly.graph_objects as go
-import plotly.express as px
+
+import cards
+import metrics
+from config import API_CONFIG, DEFAULTS, METRICS, PROFILING
+from downsample import point_budget
+from profiler import RerunProfiler
+from utils import format_age, get_weather_icon
+from models import CurrentWeather, Forecast
+from weather_api import CityNotFoundError, WeatherAPI, WeatherDataCache, normalize_city
 
 # ==================== PAGE CONFIG ====================
 st.set_page_config(
@@ -13,8 +18,17 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def get_query_param(name):
+    """First ``?name=`` value; st.query_params needs Streamlit 1.30+"""
+    if hasattr(st, "query_params"):
+        return st.query_params.get(name)
+    return (st.experimental_get_query_params().get(name) or [None])[0]
+
+# Opt-in rerun profiling: PROFILING["enabled"] / WEATHERHUB_PROFILE=1 or ?profile=1
+profiler = RerunProfiler(enabled=PROFILING["enabled"] or get_query_param("profile") == "1")
+
 # ==================== CUSTOM STYLING ====================
-st.markdown("""
+CUSTOM_CSS = """
 <style>
     /* Overall theme */
     :root {
@@ -53,214 +67,202 @@ st.markdown("""
         padding-bottom: 10px;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
 
 # ==================== API CONFIG ====================
 API_KEY = st.secrets.get("MY_API_KEY", "YOUR_API_KEY_HERE")
-BASE_URL = "https://api.openweathermap.org/data/2.5"
+
+@st.cache_resource
+def get_weather_cache(namespace="payloads"):
+    """Stale-while-revalidate cache for API payloads (in-memory or shared SQLite)"""
+    duration = API_CONFIG["openweathermap"]["uv_cache_duration"] if namespace == "uv" else DEFAULTS["cache_duration"]
+    options = dict(
+        cache_duration=duration,
+        hard_duration=max(duration, DEFAULTS["cache_hard_duration"]),
+        stale_if_error=DEFAULTS["cache_stale_if_error"],
+    )
+    if DEFAULTS["cache_backend"] == "sqlite":
+        from sqlite_cache import SQLiteWeatherCache
+        cache = SQLiteWeatherCache(DEFAULTS["cache_path"], namespace=namespace, **options)
+    else:
+        cache = WeatherDataCache(**options)
+    metrics.register_cache(namespace, cache)
+    return cache
+
+@st.cache_resource
+def start_metrics_endpoint():
+    """Expose Prometheus metrics once per process when enabled"""
+    if metrics.enabled and METRICS["port"]:
+        return metrics.start_http_server()
+    return None
+
+@st.cache_resource
+def get_figure_cache():
+    """Built charts shared across reruns and sessions, keyed on the plotted data"""
+    from charts import FigureCache  # Plotly loads with the first chart
+    cache = FigureCache()
+    metrics.register_cache("figures", cache)
+    return cache
+
+@st.cache_resource
+def get_weather_api():
+    """Shared API client so every session reuses the same connection pool"""
+    return WeatherAPI(API_KEY, uv_cache=get_weather_cache("uv"))
+
+start_metrics_endpoint()
 
 # ==================== HELPER FUNCTIONS ====================
-@st.cache_data(ttl=600)
+def cached_decoded(key, fetch, decode):
+    """
+    Cached payload, decoded -> (value, age_seconds)
+
+    The in-memory cache keeps the decoded object, so reruns skip parsing;
+    the SQLite cache stores JSON rows shared across processes, so it
+    keeps the raw payload and decoding runs on each read.
+    """
+    cache = get_weather_cache()
+    if isinstance(cache, WeatherDataCache):
+        return cache.get_or_refresh(key, lambda: decode(fetch()))
+    data, age = cache.get_or_refresh(key, fetch)
+    return decode(data), age
+
 def get_current_weather(city):
-    """Fetch current weather data from OpenWeatherMap API"""
+    """Fetch current weather from OpenWeatherMap API -> (CurrentWeather, error, age_seconds)"""
+    api = get_weather_api()
     try:
-        url = f"{BASE_URL}/weather?q={city}&appid={API_KEY}&units=metric"
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        return response.json(), None
+        weather, age = cached_decoded(
+            ("weather", normalize_city(city)),
+            lambda: api.fetch_current_weather(city, units="metric"),
+            CurrentWeather.from_dict,
+        )
+        return weather, None, age
+    except CityNotFoundError:
+        # Falls through to the "city not found" message below
+        return None, None, None
     except requests.exceptions.RequestException as e:
-        return None, f"Error fetching weather: {str(e)}"
+        return None, f"Error fetching weather: {str(e)}", None
+
+def decode_forecast(data):
+    from forecast import PARSE_FIELDS  # pandas loads with the first forecast
+    return Forecast.from_dict(data, PARSE_FIELDS)
 
-@st.cache_data(ttl=600)
 def get_forecast_data(city):
-    """Fetch 5-day forecast from OpenWeatherMap API"""
+    """Fetch 5-day forecast from OpenWeatherMap API -> (Forecast, error, age_seconds)"""
+    api = get_weather_api()
     try:
-        url = f"{BASE_URL}/forecast?q={city}&appid={API_KEY}&units=metric"
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        return response.json(), None
+        forecast, age = cached_decoded(
+            ("forecast", normalize_city(city)),
+            lambda: api.fetch_forecast(city, units="metric"),
+            decode_forecast,
+        )
+        return forecast, None, age
     except requests.exceptions.RequestException as e:
-        return None, f"Error fetching forecast: {str(e)}"
-
-def parse_forecast(forecast_data):
-    """Parse forecast JSON into a clean DataFrame"""
-    if not forecast_data or "list" not in forecast_data:
-        return None
-    
-    records = []
-    for item in forecast_data["list"]:
-        records.append({
-            "datetime": datetime.fromtimestamp(item["dt"]),
-            "temp": item["main"]["temp"],
-            "feels_like": item["main"]["feels_like"],
-            "humidity": item["main"]["humidity"],
-            "wind_speed": item["wind"]["speed"],
-            "description": item["weather"][0]["main"],
-            "pressure": item["main"]["pressure"]
-        })
-    return pd.DataFrame(records)
-
-def get_weather_emoji(description):
-    """Return an emoji based on weather description"""
-    desc_lower = description.lower()
-    emojis = {
-        "clear": "☀️",
-        "clouds": "☁️",
-        "rain": "🌧️",
-        "drizzle": "🌦️",
-        "thunderstorm": "⛈️",
-        "snow": "❄️",
-        "mist": "🌫️",
-        "smoke": "💨",
-        "haze": "🌫️",
-        "dust": "💨",
-        "fog": "🌫️",
-        "sand": "🏜️",
-        "ash": "🌋",
-        "squall": "💨",
-        "tornado": "🌪️"
-    }
-    for key, emoji in emojis.items():
-        if key in desc_lower:
-            return emoji
-    return "🌤️"
+        return None, f"Error fetching forecast: {str(e)}", None
 
 # ==================== HEADER SECTION ====================
-st.markdown("# 🌦️ Weather Forecast Pro")
-st.markdown("---")
+with profiler.section("header"):
+    st.markdown(CUSTOM_CSS + cards.CARD_CSS, unsafe_allow_html=True)
+    st.markdown("# 🌦️ Weather Forecast Pro")
+    st.markdown("---")
 
 # ==================== SIDEBAR ====================
-st.sidebar.markdown("## ⚙️ Settings & Options")
-city_input = st.sidebar.text_input("🏙️ Enter City Name", value="London", placeholder="e.g., New York, Tokyo, Paris")
-units_option = st.sidebar.radio("📏 Units", ["Metric (°C, m/s)", "Imperial (°F, mph)"], index=0)
-refresh_interval = st.sidebar.selectbox("🔄 Cache Duration", ["5 min", "10 min", "30 min"], index=0)
-
-st.sidebar.markdown("---")
-st.sidebar.markdown("### 📊 About")
-st.sidebar.markdown("Real-time weather data powered by **OpenWeatherMap API**")
-st.sidebar.markdown("*Last updated: 2025-11-14*")
+with profiler.section("sidebar"):
+    st.sidebar.markdown("## ⚙️ Settings & Options")
+    city_input = st.sidebar.text_input("🏙️ Enter City Name", value="London", placeholder="e.g., New York, Tokyo, Paris")
+    units_option = st.sidebar.radio("📏 Units", ["Metric (°C, m/s)", "Imperial (°F, mph)"], index=0)
+    refresh_interval = st.sidebar.selectbox("🔄 Cache Duration", ["5 min", "10 min", "30 min"], index=0)
+    
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 📊 About")
+    st.sidebar.markdown("Real-time weather data powered by **OpenWeatherMap API**")
+    st.sidebar.markdown("*Last updated: 2025-11-14*")
 
 # ==================== MAIN CONTENT ====================
 if city_input.strip():
     # Fetch current weather
-    weather_data, weather_error = get_current_weather(city_input)
+    with profiler.section("current weather fetch"):
+        weather_data, weather_error, weather_age = get_current_weather(city_input)
     
     if weather_error:
         st.error(f"❌ {weather_error}")
-    elif weather_data and weather_data.get("cod") == 200:
+    elif weather_data is not None:
         # Extract weather info
-        main_data = weather_data["main"]
-        weather_desc = weather_data["weather"][0]["main"]
-        wind_data = weather_data["wind"]
-        clouds_data = weather_data.get("clouds", {})
-        city_name = weather_data.get("name", "")
-        country = weather_data.get("sys", {}).get("country", "")
+        weather_desc = weather_data.condition
+        city_name = weather_data.city
+        country = weather_data.country
         
         # ==================== CURRENT WEATHER SECTION ====================
-        col1, col2, col3 = st.columns([2, 1, 1])
+        with profiler.section("current weather render"):
+            # Never blocks the render: "N/A" until the background lookup lands
+            uv_index = get_weather_api().peek_uv_index(weather_data.lat, weather_data.lon)
+            visibility = f"{weather_data.visibility:g} m" if weather_data.visibility is not None else "N/A"
         
-        with col1:
-            st.markdown(f"## {city_name}, {country}")
-            st.markdown(f"### {get_weather_emoji(weather_desc)} {weather_desc}")
-        
-        with col2:
-            st.markdown("")
-        
-        with col3:
-            st.markdown("")
-        
-        # Main metrics in a grid
-        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
-        
-        with metric_col1:
-            st.metric(label="🌡️ Temperature", value=f"{main_data['temp']}°C", delta=None)
-        
-        with metric_col2:
-            st.metric(label="🤔 Feels Like", value=f"{main_data['feels_like']}°C", delta=None)
-        
-        with metric_col3:
-            st.metric(label="💧 Humidity", value=f"{main_data['humidity']}%", delta=None)
-        
-        with metric_col4:
-            st.metric(label="💨 Wind Speed", value=f"{wind_data.get('speed', 0)} m/s", delta=None)
-        
-        st.markdown("---")
-        
-        # Additional details
-        details_col1, details_col2, details_col3, details_col4 = st.columns(4)
-        
-        with details_col1:
-            st.info(f"**Pressure**\n{main_data['pressure']} hPa")
-        
-        with details_col2:
-            st.info(f"**Cloud Cover**\n{clouds_data.get('all', 0)}%")
-        
-        with details_col3:
-            st.info(f"**Visibility**\n{weather_data.get('visibility', 'N/A')} m")
-        
-        with details_col4:
-            st.info(f"**UV Index**\n(Not available)")
-        
-        st.markdown("---")
+            # Header, main metrics and details as one HTML block (one delta per rerun)
+            st.markdown(
+                cards.header(
+                    f"{city_name}, {country}",
+                    f"{get_weather_icon(weather_desc)} {weather_desc}",
+                    f"🕒 Updated {format_age(weather_age)}",
+                )
+                + cards.card_grid([
+                    ("🌡️ Temperature", f"{weather_data.temp:g}°C"),
+                    ("🤔 Feels Like", f"{weather_data.feels_like:g}°C"),
+                    ("💧 Humidity", f"{weather_data.humidity}%"),
+                    ("💨 Wind Speed", f"{weather_data.wind_speed:g} m/s"),
+                ])
+                + "<hr>"
+                + cards.card_grid([
+                    cards.metric_card("Pressure", f"{weather_data.pressure} hPa", compact=True),
+                    cards.metric_card("Cloud Cover", f"{weather_data.clouds}%", compact=True),
+                    cards.metric_card("Visibility", visibility, compact=True),
+                    cards.metric_card("UV Index", uv_index if uv_index is not None else "N/A", compact=True),
+                ])
+                + "<hr>",
+                unsafe_allow_html=True,
+            )
         
         # ==================== FORECAST SECTION ====================
         st.markdown("## 📈 5-Day Forecast")
         
-        forecast_data, forecast_error = get_forecast_data(city_input)
+        with profiler.section("forecast fetch"):
+            forecast_data, forecast_error, forecast_age = get_forecast_data(city_input)
         
         if forecast_error:
             st.warning(f"⚠️ Could not load forecast: {forecast_error}")
-        elif forecast_data:
-            df_forecast = parse_forecast(forecast_data)
+        elif forecast_data is not None:
+            with profiler.section("parse"):
+                from forecast import parse_forecast  # pandas loads with the first forecast
+                df_forecast = parse_forecast(forecast_data)
             
             if df_forecast is not None:
+                st.caption(f"🕒 Forecast updated {format_age(forecast_age)}")
+                
+                # Long series are downsampled to the chart's point budget; zooming
+                # re-samples the chosen window from the full-resolution rows
+                max_points = point_budget()
+                df_chart = df_forecast
+                if len(df_forecast) > max_points:
+                    first = df_forecast['datetime'].iloc[0].to_pydatetime()
+                    last = df_forecast['datetime'].iloc[-1].to_pydatetime()
+                    start, end = st.slider("🔍 Zoom", min_value=first, max_value=last,
+                                           value=(first, last), format="DD MMM HH:mm")
+                    df_chart = df_forecast[df_forecast['datetime'].between(start, end)]
+                
                 # Temperature trend chart
-                fig_temp = go.Figure()
-                fig_temp.add_trace(go.Scatter(
-                    x=df_forecast['datetime'],
-                    y=df_forecast['temp'],
-                    mode='lines+markers',
-                    name='Temperature',
-                    line=dict(color='#ff7f0e', width=3),
-                    marker=dict(size=8)
-                ))
-                fig_temp.add_trace(go.Scatter(
-                    x=df_forecast['datetime'],
-                    y=df_forecast['feels_like'],
-                    mode='lines',
-                    name='Feels Like',
-                    line=dict(color='#d62728', width=2, dash='dash')
-                ))
-                fig_temp.update_layout(
-                    title="Temperature Trend",
-                    xaxis_title="Date & Time",
-                    yaxis_title="Temperature (°C)",
-                    hovermode='x unified',
-                    template='plotly_white',
-                    height=400
-                )
-                st.plotly_chart(fig_temp, use_container_width=True)
+                with profiler.section("temperature chart"):
+                    fig_temp = get_figure_cache().figure(df_chart, "temperature", units="metric",
+                                                         max_points=max_points)
+                    st.plotly_chart(fig_temp, use_container_width=True)
                 
                 # Humidity bar chart
-                fig_humidity = go.Figure()
-                fig_humidity.add_trace(go.Bar(
-                    x=df_forecast['datetime'],
-                    y=df_forecast['humidity'],
-                    name='Humidity',
-                    marker_color='#1f77b4'
-                ))
-                fig_humidity.update_layout(
-                    title="Humidity Levels",
-                    xaxis_title="Date & Time",
-                    yaxis_title="Humidity (%)",
-                    hovermode='x',
-                    template='plotly_white',
-                    height=350
-                )
-                st.plotly_chart(fig_humidity, use_container_width=True)
+                with profiler.section("humidity chart"):
+                    fig_humidity = get_figure_cache().figure(df_chart, "humidity", units="metric",
+                                                             max_points=max_points)
+                    st.plotly_chart(fig_humidity, use_container_width=True)
                 
                 # Forecast table
-                with st.expander("📋 Detailed Forecast Data"):
+                with profiler.section("table"), st.expander("📋 Detailed Forecast Data"):
                     display_df = df_forecast.copy()
                     display_df['datetime'] = display_df['datetime'].dt.strftime('%Y-%m-%d %H:%M')
                     st.dataframe(display_df, use_container_width=True)
@@ -270,9 +272,16 @@ else:
     st.info("👈 Enter a city name in the sidebar to get started!")
 
 # ==================== FOOTER ====================
-st.markdown("---")
-st.markdown("""
+with profiler.section("footer"):
+    st.markdown("---")
+    st.markdown("""
 <div style='text-align: center; color: #666;'>
     <p><small>Data from OpenWeatherMap API | Built with Streamlit</small></p>
 </div>
 """, unsafe_allow_html=True)
+
+# ==================== RERUN PROFILE ====================
+if profiler.enabled:
+    with st.expander(f"⏱️ Rerun timing: {profiler.total * 1000:.1f} ms total"):
+        st.dataframe(profiler.breakdown(), use_container_width=True)
+    profiler.flush(city=city_input)
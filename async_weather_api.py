@@ -0,0 +1,132 @@
+"""
+Asyncio counterpart of WeatherAPI for fanning out over many cities
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+
+from config import API_CONFIG
+from rate_limiter import request_priority
+from series import ForecastSeries
+from weather_api import WeatherAPI
+
+
+class AsyncWeatherAPI:
+    """
+    Async client with the same return shapes as WeatherAPI.
+
+    Each call runs the pooled, retrying WeatherAPI on a dedicated
+    executor sized to ``max_concurrency``, so connection reuse, timeouts
+    and backoff behave exactly as in the blocking client while the event
+    loop stays free. A semaphore bounds the number of in-flight calls.
+    """
+
+    KINDS = ("current", "forecast")
+
+    def __init__(self, api_key: str, base_url: str = None, max_concurrency: int = None,
+                 **client_options):
+        settings = API_CONFIG["openweathermap"]
+        self.max_concurrency = max_concurrency or settings.get("max_concurrency", 20)
+        client_options.setdefault("pool_size", self.max_concurrency)
+        self.client = WeatherAPI(api_key, base_url=base_url, **client_options)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                            thread_name_prefix="weather-api")
+        self._semaphore = None
+
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking client call off the event loop, bounded by the semaphore"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            # Propagate context (e.g. request priority) like asyncio.to_thread
+            call = partial(contextvars.copy_context().run, func, *args, **kwargs)
+            return await loop.run_in_executor(self._executor, call)
+
+    def _current(self, city: str, units: str, uv: str = "eager") -> dict:
+        return self.client.load_current_weather(city, units, uv)
+
+    def _forecast(self, city: str, days: int, units: str) -> ForecastSeries:
+        return self.client.load_forecast(city, days, units)
+
+    def _describe(self, error: BaseException) -> str:
+        """Error message with the API key scrubbed from any echoed URL"""
+        message = f"{type(error).__name__}: {error}"
+        if self.client.api_key:
+            message = message.replace(self.client.api_key, "***")
+        return message
+
+    async def get_current_weather(self, city: str, units: str = "metric", uv: str = "eager"):
+        """
+        Get current weather data for a city
+        """
+        try:
+            return await self._run(self._current, city, units, uv)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching weather data: {e}")
+            return None
+
+    async def get_forecast(self, city: str, days: int = 5, units: str = "metric"):
+        """
+        Get forecast data for a city
+        """
+        try:
+            return await self._run(self._forecast, city, days, units)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching forecast data: {e}")
+            return []
+
+    async def get_many(self, cities, kinds=("current", "forecast"), days: int = 5,
+                       units: str = "metric", uv: str = "eager", priority: int = None):
+        """
+        Fetch ``kinds`` for every city concurrently.
+
+        Returns ``(results, errors)``: ``results[city][kind]`` holds each
+        successful payload and ``errors[city][kind]`` the message of its
+        RequestException (PayloadError included), so one bad city never
+        sinks the whole batch; other exceptions propagate. ``priority`` (see
+        rate_limiter) lets dashboards and prefetch jobs yield quota to
+        interactive requests.
+        """
+        if priority is not None:
+            with request_priority(priority):
+                return await self.get_many(cities, kinds, days, units, uv)
+
+        unknown = set(kinds) - set(self.KINDS)
+        if unknown:
+            raise ValueError(f"Unknown kinds: {sorted(unknown)}")
+        
+        jobs = []
+        for city in dict.fromkeys(cities):
+            for kind in kinds:
+                if kind == "current":
+                    jobs.append((city, kind, self._run(self._current, city, units, uv)))
+                else:
+                    jobs.append((city, kind, self._run(self._forecast, city, days, units)))
+        
+        outcomes = await asyncio.gather(*(job for _, _, job in jobs), return_exceptions=True)
+        
+        results, errors = {}, {}
+        for (city, kind, _), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, requests.exceptions.RequestException):
+                errors.setdefault(city, {})[kind] = self._describe(outcome)
+            elif isinstance(outcome, BaseException):
+                raise outcome
+            else:
+                results.setdefault(city, {})[kind] = outcome
+        return results, errors
+
+    async def close(self):
+        """Release the executor and pooled connections"""
+        self._executor.shutdown(wait=False)
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for WeatherHub hot paths
+
+Covers forecast parsing, daily aggregation, caching under contention,
+utils helpers and Plotly figure construction. No network is used: data
+comes from mock_server's synthetic generator.
+
+    python benchmark.py                          # run, write JSON
+    python benchmark.py --quick                  # smaller inputs
+    python benchmark.py --baseline base.json     # compare, report regressions
+    python benchmark.py --filter parse_forecast  # subset by name
+
+Cases registered with a ``budget`` (seconds, median) fail the run when
+they exceed it, with or without a baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+
+from config import DEFAULTS
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+BENCHMARKS = []
+
+
+def benchmark(name: str, quick: bool = True, budget: float = None):
+    """
+    Register ``setup(quick) -> callable``; the callable is the timed body.
+    Cases with ``quick=False`` are skipped in --quick runs; ``budget`` is
+    the slowest acceptable median in seconds.
+    """
+    def register(setup):
+        BENCHMARKS.append({"name": name, "setup": setup, "quick": quick, "budget": budget})
+        return setup
+    return register
+
+
+def time_callable(func, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """Auto-ranged timing: calls per round chosen so a round lasts ~min_time/repeat"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / repeat / 10 else 2
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return {
+        "number": number,
+        "repeat": repeat,
+        "min_s": min(rounds),
+        "median_s": statistics.median(rounds),
+        "mean_s": statistics.fmean(rounds),
+        "stdev_s": statistics.stdev(rounds) if len(rounds) > 1 else 0.0,
+    }
+
+
+# ==================== FIXTURES ====================
+
+_payloads = {}
+
+
+def forecast_payload(rows: int) -> dict:
+    """Synthetic /forecast payload with ``rows`` 3-hour slots (memoized)"""
+    if rows not in _payloads:
+        from mock_server import SyntheticWeather
+        _payloads[rows] = SyntheticWeather().forecast({"q": "London", "cnt": rows, "units": "metric"})[1]
+    return _payloads[rows]
+
+
+# ==================== CASES ====================
+
+# 100k-row decode budgets: the per-column map pipelines take ~0.18 s for
+# all columns on a laptop; zipping the labels through tuples took ~0.30 s
+DECODE_BUDGETS = {100_000: 0.25}
+
+
+def _register_parse_forecast():
+    for rows in (40, 1_000, 10_000, 100_000):
+        @benchmark(f"parse_forecast[{rows}]", quick=rows <= 1_000, budget=DECODE_BUDGETS.get(rows))
+        def setup(quick, rows=rows):
+            from forecast import parse_forecast
+            payload = forecast_payload(rows)
+            return lambda: parse_forecast(payload)
+
+        @benchmark(f"Forecast.from_dict[{rows}]", quick=rows <= 1_000, budget=DECODE_BUDGETS.get(rows))
+        def setup(quick, rows=rows):
+            from models import Forecast
+            payload = forecast_payload(rows)
+            return lambda: Forecast.from_dict(payload)
+
+
+def _register_daily_aggregation():
+    for rows in (40, 1_000, 10_000):
+        @benchmark(f"weather_api.parse_daily_forecast[{rows}]", quick=rows <= 1_000)
+        def setup(quick, rows=rows):
+            from weather_api import WeatherAPI
+            api = WeatherAPI("bench", rate_limiter=False)
+            payload = forecast_payload(rows)
+            days = max(rows // 8, 1)
+            return lambda: api.parse_daily_forecast(payload, days)
+
+
+@benchmark("weather_api.get_forecast[mock_http]")
+def _get_forecast_http(quick):
+    from mock_server import start_mock_server
+    from weather_api import WeatherAPI
+    server = start_mock_server(latency="fixed:0")
+    api = WeatherAPI("bench", base_url=server.base_url, rate_limiter=False, coalesce=False)
+    api.get_forecast("London")  # warm the connection pool
+    return lambda: api.get_forecast("London")
+
+
+def _register_cache_contention():
+    for threads in (1, 8):
+        @benchmark(f"WeatherDataCache.get_set[threads={threads}]")
+        def setup(quick, threads=threads):
+            from weather_api import WeatherDataCache
+            cache = WeatherDataCache(cache_duration=600, max_entries=512)
+            keys = [f"city-{i}" for i in range(1_000)]
+            payload = {"temp": 21.5, "humidity": 60}
+            ops = 2_000
+
+            def worker(offset):
+                get, put = cache.get, cache.set
+                for i in range(ops):
+                    key = keys[(i * 7 + offset) % len(keys)]
+                    if get(key) is None:
+                        put(key, payload)
+
+            def run():
+                pool = [threading.Thread(target=worker, args=(n * 101,)) for n in range(threads)]
+                for t in pool:
+                    t.start()
+                for t in pool:
+                    t.join()
+            return run
+
+
+@benchmark("utils.classification[10k]")
+def _utils_classification(quick):
+    import utils
+    values = [i * 0.01 for i in range(10_000)]
+
+    def run():
+        for v in values:
+            utils.calculate_uv_level(v)
+            utils.get_uv_color(v)
+            utils.get_visibility_description(v)
+            utils.get_pressure_description(990 + v)
+            utils.get_humidity_description(v)
+            utils.get_color_for_temp(v - 20)
+    return run
+
+
+@benchmark("classification.batch[100k]")
+def _classification_batch(quick):
+    import numpy as np
+    import classification
+    values = np.linspace(0, 100, 100_000)
+    conditions = np.array(["Clear", "Clouds", "Rain", "Snow", "Thunderstorm", "Mist",
+                           "Drizzle", "Haze"] * 12_500, dtype=object)
+
+    def run():
+        classification.UV_LEVEL.batch(values / 8)
+        classification.UV_COLOR.batch(values / 8)
+        classification.VISIBILITY.batch(values / 5)
+        classification.PRESSURE.batch(990 + values / 2)
+        classification.HUMIDITY.batch(values)
+        classification.TEMPERATURE_COLOR.batch(values - 40)
+        classification.WEATHER_ICON.batch(conditions)
+    return run
+
+
+@benchmark("utils.formatting[10k]")
+def _utils_formatting(quick):
+    import utils
+    values = [i * 0.01 for i in range(10_000)]
+    conditions = ["Clear", "Clouds", "Rain", "Snow", "Thunderstorm", "Mist", "Drizzle", "Haze"]
+
+    def run():
+        for i, v in enumerate(values):
+            utils.format_temperature(v)
+            utils.convert_temperature(v, "°C", "°F")
+            utils.convert_wind_speed(v, "m/s", "km/h")
+            utils.get_wind_direction(v)
+            utils.get_weather_icon(conditions[i % len(conditions)])
+            utils.get_forecast_icon(conditions[i % len(conditions)])
+    return run
+
+
+@benchmark("utils.convert_units[vectorized,100k]")
+def _utils_convert_units(quick):
+    import numpy as np
+    import utils
+    values = np.linspace(-30, 45, 100_000)
+
+    def run():
+        utils.convert_temperature(values, "°C", "°F")
+        utils.convert_wind_speed(values, "m/s", "knots")
+        utils.convert_pressure(values + 1000, "hPa", "inHg")
+    return run
+
+
+@benchmark("derived.derive_metrics[100k]")
+def _derived_metrics(quick):
+    import numpy as np
+    from derived import derive_metrics
+    temp = np.linspace(-30, 45, 100_000)
+    humidity = np.linspace(5, 100, 100_000)
+    wind = np.linspace(0, 25, 100_000)
+    return lambda: derive_metrics(temp, humidity, wind, "metric")
+
+
+@benchmark("cards.render_grid")
+def _cards_render_grid(quick):
+    import cards
+    metrics = [("🌡️ Temperature", "21.5°C"), ("🤔 Feels Like", "20.9°C"),
+               ("💧 Humidity", "64%"), ("💨 Wind Speed", "4.1 m/s")]
+
+    def run():
+        cards.header("São Paulo, BR", "☁️ Clouds", "🕒 Updated just now")
+        cards.card_grid(metrics)
+        cards.card_grid([cards.metric_card(label, value, compact=True) for label, value in metrics])
+    return run
+
+
+@benchmark("downsample.lttb[1M->1200]", quick=False)
+def _downsample_lttb(quick):
+    import numpy as np
+    from downsample import lttb, min_max
+    x = np.arange(1_000_000)
+    y = np.cumsum(np.random.default_rng(0).normal(size=1_000_000))
+    return lambda: (lttb(x, y, 1200), min_max(y, 1200))
+
+
+def _register_charts():
+    for rows in (40, 10_000):
+        @benchmark(f"charts.build[{rows}]", quick=rows <= 40)
+        def setup(quick, rows=rows):
+            from charts import build_humidity_chart, build_temperature_chart
+            from forecast import parse_forecast
+            df = parse_forecast(forecast_payload(rows))
+            return lambda: (build_temperature_chart(df), build_humidity_chart(df))
+
+        @benchmark(f"charts.build_and_serialize[{rows}]", quick=rows <= 40)
+        def setup_json(quick, rows=rows):
+            from charts import build_humidity_chart, build_temperature_chart
+            from forecast import parse_forecast
+            df = parse_forecast(forecast_payload(rows))
+            return lambda: (build_temperature_chart(df).to_json(), build_humidity_chart(df).to_json())
+
+        @benchmark(f"charts.cached_figure[{rows}]", quick=rows <= 40)
+        def setup_cached(quick, rows=rows):
+            from charts import FigureCache
+            from forecast import parse_forecast
+            df = parse_forecast(forecast_payload(rows))
+            cache = FigureCache()
+            return lambda: (cache.figure(df, "temperature"), cache.figure(df, "humidity"))
+
+
+def _register_series():
+    for rows in (1_000, 100_000):
+        @benchmark(f"series.window_to_frame[{rows}]", quick=rows <= 1_000)
+        def setup(quick, rows=rows):
+            from models import Forecast
+            from series import ForecastSeries
+            series = ForecastSeries.from_forecast(Forecast.from_dict(forecast_payload(rows)))
+            start, end = series.timestamps[len(series) // 4], series.timestamps[len(series) // 2]
+            return lambda: series.window(start, end).to_frame()
+
+
+def _register_streaming():
+    for rows in (1_000, 100_000):
+        @benchmark(f"streaming.read_forecast[{rows}]", quick=rows <= 1_000)
+        def setup(quick, rows=rows):
+            from streaming import read_forecast
+            body = json.dumps(forecast_payload(rows)).encode()
+            chunk = 1 << 16
+            return lambda: read_forecast(body[i:i + chunk] for i in range(0, len(body), chunk))
+
+
+def _app_imports() -> str:
+    """app.py's top-level import statements (imports deferred to first use excluded)"""
+    import ast
+    with open(os.path.join(ROOT, "app.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+# Cold start, timed in a fresh interpreter: entry point -> source to run
+IMPORT_ENTRY_POINTS = {
+    "app": _app_imports,
+    "cli": lambda: "import core, derived",
+    "worker": lambda: "import async_weather_api",
+}
+
+
+def _register_import_time():
+    for entry, source in IMPORT_ENTRY_POINTS.items():
+        @benchmark(f"import_time[{entry}]")
+        def setup(quick, source=source):
+            import subprocess
+            command = [sys.executable, "-c", source()]
+            return lambda: subprocess.run(command, cwd=ROOT, check=True)
+
+
+_register_parse_forecast()
+_register_daily_aggregation()
+_register_series()
+_register_streaming()
+_register_cache_contention()
+_register_charts()
+_register_import_time()
+
+
+# ==================== RUNNER ====================
+
+def run_benchmarks(quick: bool = False, name_filter: str = None, min_time: float = 0.2) -> dict:
+    results = {}
+    for case in BENCHMARKS:
+        if quick and not case["quick"]:
+            continue
+        if name_filter and name_filter not in case["name"]:
+            continue
+        func = case["setup"](quick)
+        func()  # warm-up
+        result = results[case["name"]] = time_callable(func, min_time=min_time)
+        result["budget_s"] = case["budget"]
+        over = case["budget"] is not None and result["median_s"] > case["budget"]
+        print(f"  {case['name']:<48} {format_seconds(result['median_s']):>12}"
+              + (f"  OVER BUDGET ({format_seconds(case['budget'])})" if over else ""))
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Print a comparison table; returns names that regressed past ``threshold``"""
+    regressions = []
+    print(f"\n{'benchmark':<48} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<48} {'-':>12} {format_seconds(result['median_s']):>12} {'new':>9}")
+            continue
+        ratio = result["median_s"] / base["median_s"] if base["median_s"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<48} {format_seconds(base['median_s']):>12} "
+              f"{format_seconds(result['median_s']):>12} {ratio - 1:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WeatherHub benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="skip large inputs")
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--output", default=DEFAULTS["benchmark_output"])
+    parser.add_argument("--baseline", help="previous JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="relative slowdown reported as a regression (default 0.15)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per benchmark")
+    args = parser.parse_args()
+
+    print("Running benchmarks...")
+    current = run_benchmarks(args.quick, args.filter, args.min_time)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    over_budget = [name for name, result in current["results"].items()
+                   if result["budget_s"] is not None and result["median_s"] > result["budget_s"]]
+    if over_budget:
+        print(f"\n{len(over_budget)} over budget: {', '.join(over_budget)}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions.")
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Glass-card HTML for the Streamlit UI
+
+Templates are compiled once, at import, from config.COLORS and
+config.STYLES. A whole grid of cards renders to one HTML string, so it
+reaches the browser as a single ``st.markdown`` delta instead of one
+element per value. Text fields (labels, values, titles, city names) are
+HTML-escaped; only ``glass_card`` content is taken as markup.
+"""
+
+from html import escape
+from string import Template
+
+from config import COLORS, STYLES
+
+_CSS = Template("""
+<style>
+    .card-grid {
+        display: grid;
+        grid-template-columns: repeat(var(--card-columns, 4), minmax(0, 1fr));
+        gap: $padding_medium;
+        margin: $padding_small 0;
+    }
+    .glass-card, .glass-card-dark {
+        background: linear-gradient(135deg, $gradient_start 0%, $gradient_end 100%);
+        border: 1px solid $card_border;
+        border-radius: $border_radius_medium;
+        padding: $padding_medium;
+        color: $text_primary;
+        box-shadow: $shadow_light;
+        backdrop-filter: $backdrop_blur;
+    }
+    .glass-card-dark { box-shadow: $shadow_medium; }
+    .glass-card-dark.compact { padding: $padding_small $padding_medium; }
+    .metric-label { color: $text_secondary; font-size: $font_size_normal; margin: 0; }
+    .metric-value { font-size: $font_size_large; font-weight: 600; line-height: 1.2; }
+    .compact .metric-value { font-size: $font_size_medium; }
+    .card-header h2 { margin-bottom: 0; }
+    .card-caption { opacity: 0.6; font-size: $font_size_small; }
+</style>
+""")
+# Whitespace collapsed: the stylesheet is resent with every rerun
+CARD_CSS = " ".join(_CSS.substitute(COLORS, **STYLES).split())
+
+# Per-card templates: only escaped text is formatted in on each render
+_GLASS_CARD = "<div class='glass-card' style='height: {height};'>{title}{content}</div>"
+_TITLE = "<h3 style='margin-top: 0;'>{}</h3>"
+_METRIC_CARD = ("<div class='glass-card-dark{variant}' style='text-align: center;'>"
+                "<p class='metric-label'>{label}</p>{icon}"
+                "<div class='metric-value'>{value}</div></div>")
+_ICON = "<div style='font-size: {size}; margin: {margin} 0;'>{{}}</div>".format(
+    size=STYLES["font_size_large"], margin=STYLES["padding_small"])
+_GRID = "<div class='card-grid' style='--card-columns: {columns};'>{cards}</div>"
+_HEADER = "<div class='card-header'><h2>{title}</h2>{subtitle}{caption}</div>"
+_SUBTITLE = "<h3>{}</h3>"
+_CAPTION = "<p class='card-caption'>{}</p>"
+
+
+def glass_card(content: str, title: str = None, height: str = "auto") -> str:
+    """Card around ``content`` (HTML, inserted as is) with an optional text title"""
+    return _GLASS_CARD.format(
+        height=escape(str(height)),
+        title=_TITLE.format(escape(str(title))) if title else "",
+        content=content,
+    )
+
+
+def metric_card(label: str, value, icon: str = None, compact: bool = False) -> str:
+    """One label/value card"""
+    return _METRIC_CARD.format(
+        variant=" compact" if compact else "",
+        label=escape(str(label)),
+        icon=_ICON.format(escape(str(icon))) if icon else "",
+        value=escape(str(value)),
+    )
+
+
+def card_grid(cards, columns: int = None) -> str:
+    """
+    Rendered cards laid out in one grid block; ``cards`` are HTML strings
+    or ``(label, value[, icon])`` tuples. Defaults to one row.
+    """
+    cards = [card if isinstance(card, str) else metric_card(*card) for card in cards]
+    return _GRID.format(columns=int(columns or len(cards) or 1), cards="".join(cards))
+
+
+def header(title: str, subtitle: str = None, caption: str = None) -> str:
+    """Section heading with optional subtitle and caption lines"""
+    return _HEADER.format(
+        title=escape(str(title)),
+        subtitle=_SUBTITLE.format(escape(str(subtitle))) if subtitle else "",
+        caption=_CAPTION.format(escape(str(caption))) if caption else "",
+    )
@@ -0,0 +1,142 @@
+"""
+Plotly figure builders for the forecast section
+
+``FigureCache`` memoizes built figures, keyed on a fingerprint of the
+plotted columns, so a rerun with unchanged forecast data skips figure
+construction entirely.
+"""
+
+import hashlib
+
+import numpy as np
+import plotly.graph_objects as go
+
+from config import DEFAULTS
+from downsample import lttb, min_max
+from weather_api import WeatherDataCache, approx_size
+
+DEFAULT_THEME = "plotly_white"
+
+# OpenWeatherMap ``units`` parameter -> temperature axis unit
+TEMPERATURE_UNITS = {"metric": "°C", "imperial": "°F", "standard": "K"}
+
+
+def _sampled(df_forecast, column: str, max_points: int = None, select=lttb):
+    """
+    ``(x, y)`` for one trace; past ``max_points`` rows only the samples
+    picked by ``select`` (lttb for lines, min_max for bars) are kept
+    """
+    x, y = df_forecast['datetime'], df_forecast[column]
+    if not max_points or len(y) <= max_points:
+        return x, y
+    if select is lttb:
+        keep = lttb(x.to_numpy(), y.to_numpy(), max_points)
+    else:
+        keep = select(y.to_numpy(), max_points)
+    return x.to_numpy()[keep], y.to_numpy()[keep]
+
+
+def build_temperature_chart(df_forecast, units: str = "metric", theme: str = DEFAULT_THEME,
+                            max_points: int = None):
+    """Temperature and feels-like trend lines (LTTB-downsampled past ``max_points``)"""
+    fig_temp = go.Figure()
+    x, y = _sampled(df_forecast, 'temp', max_points)
+    fig_temp.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode='lines+markers',
+        name='Temperature',
+        line=dict(color='#ff7f0e', width=3),
+        marker=dict(size=8)
+    ))
+    x, y = _sampled(df_forecast, 'feels_like', max_points)
+    fig_temp.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        name='Feels Like',
+        line=dict(color='#d62728', width=2, dash='dash')
+    ))
+    fig_temp.update_layout(
+        title="Temperature Trend",
+        xaxis_title="Date & Time",
+        yaxis_title=f"Temperature ({TEMPERATURE_UNITS[units]})",
+        hovermode='x unified',
+        template=theme,
+        height=400
+    )
+    return fig_temp
+
+
+def build_humidity_chart(df_forecast, units: str = "metric", theme: str = DEFAULT_THEME,
+                         max_points: int = None):
+    """Humidity bars per forecast slot (each bucket's min and max past ``max_points``)"""
+    fig_humidity = go.Figure()
+    x, y = _sampled(df_forecast, 'humidity', max_points, select=min_max)
+    fig_humidity.add_trace(go.Bar(
+        x=x,
+        y=y,
+        name='Humidity',
+        marker_color='#1f77b4'
+    ))
+    fig_humidity.update_layout(
+        title="Humidity Levels",
+        xaxis_title="Date & Time",
+        yaxis_title="Humidity (%)",
+        hovermode='x',
+        template=theme,
+        height=350
+    )
+    return fig_humidity
+
+
+# chart type -> (builder, DataFrame columns it plots)
+CHARTS = {
+    "temperature": (build_temperature_chart, ("datetime", "temp", "feels_like")),
+    "humidity": (build_humidity_chart, ("datetime", "humidity")),
+}
+
+
+def fingerprint(df, columns) -> str:
+    """Digest of ``columns``' raw values (and names, dtypes and length)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in columns:
+        values = np.ascontiguousarray(df[name].to_numpy())
+        digest.update(f"{name}:{values.dtype.str}:{len(values)};".encode())
+        digest.update(values.view(np.uint8) if values.dtype.kind in "iufMmb" else repr(values.tolist()).encode())
+    return digest.hexdigest()
+
+
+def figure_size(figure) -> int:
+    """Approximate memory held by a figure: its data and layout as plain values"""
+    return approx_size(figure.to_plotly_json())
+
+
+class FigureCache(WeatherDataCache):
+    """
+    Built figures, keyed on
+    (data fingerprint, chart type, units, theme, point budget)
+
+    Entries are sized with ``figure_size``, so ``max_bytes`` bounds the
+    approximate memory of the figures kept. Cached figures are shared
+    between reruns and sessions: treat them as read-only.
+    """
+
+    def __init__(self, cache_duration: int = None, max_entries: int = None, max_bytes: int = None):
+        super().__init__(
+            cache_duration=DEFAULTS["figure_cache_duration"] if cache_duration is None else cache_duration,
+            max_entries=DEFAULTS["figure_cache_max_entries"] if max_entries is None else max_entries,
+            max_bytes=DEFAULTS["figure_cache_max_bytes"] if max_bytes is None else max_bytes,
+            sizeof=figure_size,
+        )
+
+    def figure(self, df_forecast, chart: str, units: str = "metric", theme: str = DEFAULT_THEME,
+               max_points: int = None):
+        """The ``chart`` figure, built only on a miss"""
+        builder, columns = CHARTS[chart]
+        key = (fingerprint(df_forecast, columns), chart, units, theme, max_points)
+        figure = self.get(key)
+        if figure is None:
+            figure = builder(df_forecast, units, theme, max_points)
+            self.set(key, figure)
+        return figure
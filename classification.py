@@ -0,0 +1,133 @@
+"""
+Table-driven labelling of weather values and condition strings
+
+Every classifier is compiled once from the tables in config.py. Scalars
+go through a cached bisect / regex lookup; arrays and pandas Series are
+labelled in one vectorized pass.
+"""
+
+import functools
+import re
+from bisect import bisect_right
+
+import numpy as np
+
+from config import (DEFAULT_WEATHER_ICON, HUMIDITY_LEVELS, PRESSURE_LEVELS, TEMPERATURE_COLORS,
+                    UV_INDEX_LEVELS, VISIBILITY_LEVELS, WEATHER_ICONS)
+
+
+def _like(values, result: np.ndarray):
+    """Wrap ``result`` like ``values``: Series stay Series, everything else is an array"""
+    index = getattr(values, "index", None)
+    if index is not None and hasattr(values, "to_numpy"):
+        return type(values)(result, index=index, name=getattr(values, "name", None))
+    return result
+
+
+class Classifier:
+    """
+    Maps numbers to labels by sorted breakpoints
+
+    ``labels[i]`` applies to ``edges[i-1] <= value < edges[i]``, so there is
+    one more label than edges. NaN gets ``nan_label`` (default: the last
+    label).
+    """
+
+    __slots__ = ("edges", "labels", "nan_label", "_edge_list", "_label_array", "_nan_index")
+
+    def __init__(self, edges, labels, nan_label=None):
+        if len(labels) != len(edges) + 1:
+            raise ValueError("Classifier needs exactly one more label than edges")
+        self._edge_list = [float(edge) for edge in edges]
+        if self._edge_list != sorted(self._edge_list):
+            raise ValueError("Classifier edges must be ascending")
+        self.edges = np.asarray(self._edge_list, dtype=np.float64)
+        self.labels = list(labels)
+        self.nan_label = self.labels[-1] if nan_label is None else nan_label
+        self._label_array = np.empty(len(self.labels) + 1, dtype=object)
+        self._label_array[:] = [*self.labels, self.nan_label]
+        self._nan_index = len(self.labels)
+
+    @classmethod
+    def from_levels(cls, levels: dict, field: str = None) -> "Classifier":
+        """
+        Build from an ascending ``{name: {"min": ..., "exclusive": ...}}`` table
+        (labels are the names, or each level's ``field``); the level marked
+        ``"nan": True``, if any, labels NaN
+        """
+        edges, labels, nan_label = [], [], None
+        for i, (name, level) in enumerate(levels.items()):
+            labels.append(name if field is None else level[field])
+            if level.get("nan"):
+                nan_label = labels[-1]
+            if i == 0:
+                continue
+            bound = float(level["min"])
+            # "value > min" is "value >= the next float above min"
+            edges.append(np.nextafter(bound, np.inf) if level.get("exclusive") else bound)
+        return cls(edges, labels, nan_label)
+
+    @classmethod
+    def from_ranges(cls, levels: dict, field: str = None) -> "Classifier":
+        """Build from ascending half-open ``{"range": (low, high)}`` levels"""
+        table = {name: {**level, "min": level["range"][0]} for name, level in levels.items()}
+        return cls.from_levels(table, field)
+
+    def __call__(self, value):
+        if value != value:  # NaN
+            return self.nan_label
+        return self.labels[bisect_right(self._edge_list, value)]
+
+    def batch(self, values):
+        """Label a whole array/Series/list with one searchsorted"""
+        numbers = np.asarray(values, dtype=np.float64)
+        positions = np.searchsorted(self.edges, numbers, side="right")
+        positions[np.isnan(numbers)] = self._nan_index
+        return _like(values, self._label_array[positions])
+
+
+class IconMatcher:
+    """
+    Condition text -> icon, compiled from a ``{keyword: icon}`` table
+
+    Keywords match case-insensitively at the start of a word; the earliest
+    keyword in the text wins and, at the same position, the longest one
+    ("Partly Cloudy" before "Cloudy"). Results are memoized, which covers
+    the small vocabulary of OpenWeatherMap conditions and descriptions.
+    """
+
+    def __init__(self, icons: dict, default: str = DEFAULT_WEATHER_ICON):
+        keywords = sorted(icons, key=len, reverse=True)
+        self._pattern = re.compile(r"\b(?:%s)" % "|".join(map(re.escape, keywords)), re.IGNORECASE)
+        self._icons = {keyword.lower(): icon for keyword, icon in icons.items()}
+        self.default = default
+        self.icon = functools.lru_cache(maxsize=1024)(self._match)
+
+    def _match(self, condition) -> str:
+        match = self._pattern.search(condition) if isinstance(condition, str) else None
+        return self._icons[match.group(0).lower()] if match else self.default
+
+    def __call__(self, condition) -> str:
+        return self.icon(condition)
+
+    def batch(self, conditions):
+        """Icons for a whole array/Series/list: one lookup per distinct condition"""
+        values = np.asarray(conditions, dtype=object)
+        if not values.size:
+            return _like(conditions, np.empty(0, dtype=object))
+        keys = np.where(np.equal(values, None), "", values).astype(str)
+        distinct, inverse = np.unique(keys, return_inverse=True)
+        icons = np.empty(len(distinct), dtype=object)
+        icons[:] = [self.icon(condition) for condition in distinct.tolist()]
+        return _like(conditions, icons[inverse.reshape(values.shape)])
+
+
+# ==================== COMPILED TABLES ====================
+
+UV_LEVEL = Classifier.from_ranges(UV_INDEX_LEVELS)
+UV_COLOR = Classifier.from_ranges(UV_INDEX_LEVELS, "color")
+VISIBILITY = Classifier.from_levels(VISIBILITY_LEVELS)
+PRESSURE = Classifier.from_levels(PRESSURE_LEVELS)
+HUMIDITY = Classifier.from_levels(HUMIDITY_LEVELS)
+TEMPERATURE_COLOR = Classifier.from_levels(TEMPERATURE_COLORS, "color")
+WEATHER_ICON = IconMatcher(WEATHER_ICONS)
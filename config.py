@@ -3,6 +3,8 @@ Configuration file for WeatherHub
 Customize colors, fonts, and behavior
 """
 
+import os
+
 # ===== COLOR SCHEME =====
 COLORS = {
     # Gradient background colors
@@ -97,7 +99,19 @@ WEATHER_ICONS = {
     "Mist": "🌫️",
     "Sunny": "🌞",
     "Partly Cloudy": "🌤️",
+    "Storm": "⛈️",
+    "Thunder": "⛈️",
+    "Smoke": "💨",
+    "Haze": "🌫️",
+    "Dust": "💨",
+    "Fog": "🌫️",
+    "Sand": "🏜️",
+    "Ash": "🌋",
+    "Squall": "💨",
+    "Wind": "💨",
+    "Tornado": "🌪️",
 }
+DEFAULT_WEATHER_ICON = "🌤️"
 
 # ===== NAVIGATION MENU =====
 MENU_ITEMS = {
@@ -137,6 +151,25 @@ DEFAULTS = {
     "pressure_unit": "mb",
     "forecast_days": 5,
     "cache_duration": 600,  # 10 minutes in seconds
+    "cache_max_entries": 2048,
+    "cache_max_bytes": 64 * 1024 * 1024,  # approximate, 64 MB
+    # Stale-while-revalidate: past cache_duration (soft TTL) and before
+    # cache_hard_duration, serve the cached value and refresh in background
+    "cache_hard_duration": 1800,
+    # Past the hard TTL, keep serving stale data this long if upstream fails
+    "cache_stale_if_error": 3600,
+    # "memory" (per process) or "sqlite" (shared file, survives restarts)
+    "cache_backend": "memory",
+    "cache_path": ".cache/weather_cache.sqlite3",
+    "benchmark_output": ".cache/benchmarks/latest.json",
+    # Built Plotly figures, keyed on a fingerprint of the plotted data
+    "figure_cache_duration": 3600,
+    "figure_cache_max_entries": 64,
+    "figure_cache_max_bytes": 64 * 1024 * 1024,  # approximate figure memory
+    # Chart downsampling: point budget = width x points per pixel (at least min)
+    "chart_width_px": 1200,
+    "chart_points_per_px": 1,
+    "chart_min_points": 100,
     "sidebar_collapsed": False,
 }
 
@@ -144,9 +177,51 @@ DEFAULTS = {
 API_CONFIG = {
     # OpenWeatherMap API
     "openweathermap": {
-        "base_url": "https://api.openweathermap.org/data/2.5",
+        # Override with WEATHER_API_BASE_URL, e.g. to use mock_server.py
+        "base_url": os.environ.get("WEATHER_API_BASE_URL", "https://api.openweathermap.org/data/2.5"),
         "api_key": "YOUR_API_KEY_HERE",  # Replace with your key
         "timeout": 5,
+        # Per-endpoint read timeouts (seconds); falls back to "timeout"
+        "timeouts": {
+            "weather": 5,
+            "forecast": 8,
+            "uvi": 5,
+        },
+        "connect_timeout": 3.05,
+        # Connection pooling / keep-alive
+        "pool_size": 10,
+        "keep_alive": True,
+        # Retries on 429/5xx and connection errors (jittered exponential backoff)
+        "max_retries": 3,
+        "backoff_factor": 0.5,
+        "backoff_max": 8,
+        # Max in-flight requests for AsyncWeatherAPI.get_many
+        "max_concurrency": 20,
+        # UV index cache: keyed on lat/lon rounded to this many decimals
+        # (1 decimal ~ 11 km), UV changes slowly so an hour is plenty
+        "uv_grid_decimals": 1,
+        "uv_cache_duration": 3600,
+        # How long to remember a city's coordinates for concurrent UV lookups
+        "coords_cache_duration": 86400,
+        # Share one upstream call between identical concurrent requests
+        "coalesce_requests": True,
+        # Negative caching, kept apart from positive entries: remember
+        # unknown cities (404) for a while and back off briefly after
+        # transient failures (timeouts, 429/5xx)
+        "not_found_cache_duration": 300,
+        "failure_backoff_duration": 30,
+        "negative_cache_max_entries": 4096,
+        # Token-bucket quota shared by every WeatherAPI in the process
+        # (free tier: 60 calls/minute). Set shared_path to a file to share
+        # the bucket across processes. max_wait is per priority (None = wait)
+        "rate_limit": {
+            "enabled": True,
+            "calls_per_minute": 60,
+            "burst": 10,
+            "reserve_interactive": 2,
+            "max_wait": {"interactive": 10, "prefetch": 30, "batch": None},
+            "shared_path": None,
+        },
     },
     
     # Weather API alternative
@@ -157,6 +232,33 @@ API_CONFIG = {
     },
 }
 
+# ===== METRICS (metrics.py) =====
+METRICS = {
+    "enabled": os.environ.get("WEATHERHUB_METRICS", "") == "1",
+    "host": "127.0.0.1",
+    "port": int(os.environ.get("WEATHERHUB_METRICS_PORT", 9108)),  # 0 to disable the HTTP endpoint
+    "textfile": ".cache/metrics/weatherhub.prom",
+    "textfile_interval": 15,  # seconds between rewrites when the port is taken
+}
+
+# ===== RERUN PROFILING (profiler.py) =====
+PROFILING = {
+    # Also enabled per session with ?profile=1 in the app URL
+    "enabled": os.environ.get("WEATHERHUB_PROFILE", "") == "1",
+    "log_path": ".cache/profile/reruns.jsonl",
+}
+
+# ===== MOCK SERVER (mock_server.py) =====
+MOCK_SERVER = {
+    "host": "127.0.0.1",
+    "port": 8765,
+    "latency": "lognormal:60,0.4",  # milliseconds, see mock_server.parse_latency
+    "error_rate": 0.0,
+    "rate_429": 0.0,
+    "recordings": ".cache/recordings",
+    "upstream": "https://api.openweathermap.org/data/2.5",
+}
+
 # ===== CHART CONFIGURATION =====
 CHART_CONFIG = {
     "show_toolbar": False,
@@ -212,12 +314,47 @@ THEME_PRESETS = {
 }
 
 # ===== UV INDEX LEVELS =====
+# Half-open ranges [low, high) that tile the whole scale
 UV_INDEX_LEVELS = {
-    "Low": {"range": (0, 2), "color": "rgb(50, 255, 50)", "advice": "No protection required"},
-    "Moderate": {"range": (3, 5), "color": "rgb(255, 255, 50)", "advice": "Wear sunscreen"},
-    "High": {"range": (6, 7), "color": "rgb(255, 150, 50)", "advice": "Seek shade during midday"},
-    "Very High": {"range": (8, 10), "color": "rgb(255, 50, 50)", "advice": "Avoid sun exposure"},
-    "Extreme": {"range": (11, 16), "color": "rgb(150, 0, 255)", "advice": "Stay indoors"},
+    "Low": {"range": (0, 3), "color": "rgb(50, 255, 50)", "advice": "No protection required"},
+    "Moderate": {"range": (3, 6), "color": "rgb(255, 255, 50)", "advice": "Wear sunscreen"},
+    "High": {"range": (6, 8), "color": "rgb(255, 150, 50)", "advice": "Seek shade during midday"},
+    "Very High": {"range": (8, 11), "color": "rgb(255, 50, 50)", "advice": "Avoid sun exposure"},
+    "Extreme": {"range": (11, float("inf")), "color": "rgb(150, 0, 255)", "advice": "Stay indoors"},
+}
+
+# ===== DESCRIPTION THRESHOLDS =====
+# Ascending levels: a value takes the last level whose "min" it reaches
+# ("min" None = unbounded below; "exclusive" = value must exceed "min";
+# "nan": True = label for NaN, otherwise the last level)
+VISIBILITY_LEVELS = {  # km
+    "Very Poor": {"min": None, "nan": True},
+    "Poor": {"min": 0, "exclusive": True},
+    "Moderate": {"min": 1},
+    "Good": {"min": 5},
+    "Excellent": {"min": 10},
+}
+
+PRESSURE_LEVELS = {  # hPa
+    "Very Low - Storm Risk": {"min": None, "nan": True},
+    "Low - Unstable Weather": {"min": 990, "exclusive": True},
+    "Normal": {"min": 1010, "exclusive": True},
+    "High - Stable Weather": {"min": 1020, "exclusive": True},
+}
+
+HUMIDITY_LEVELS = {  # %
+    "Dry": {"min": None},
+    "Comfortable": {"min": 30},
+    "Humid": {"min": 50},
+    "Very Humid": {"min": 70},
+}
+
+TEMPERATURE_COLORS = {  # °C
+    "Cold": {"min": None, "color": "rgb(100, 200, 255)"},
+    "Cool": {"min": 0, "color": "rgb(150, 200, 255)"},
+    "Mild": {"min": 10, "color": "rgb(200, 200, 0)"},
+    "Warm": {"min": 20, "color": "rgb(255, 150, 50)"},
+    "Hot": {"min": 30, "color": "rgb(255, 50, 50)"},
 }
 
 # ===== AIR QUALITY LEVELS =====
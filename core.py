@@ -0,0 +1,318 @@
+"""
+Streamlit-free computation helpers: unit conversion, classification and
+formatting
+
+Imports only NumPy and the config tables, so CLIs, workers and tests can
+use them without loading Streamlit, pandas or Plotly. ``utils``
+re-exports everything here for the app.
+"""
+
+from datetime import datetime, timedelta
+from fractions import Fraction
+
+import numpy as np
+
+from classification import (HUMIDITY, PRESSURE, TEMPERATURE_COLOR, UV_COLOR, UV_LEVEL,
+                            VISIBILITY, WEATHER_ICON)
+from config import PRESSURE_UNITS
+
+
+def get_weather_icon(condition: str) -> str:
+    """
+    Get emoji icon for weather condition
+    """
+    return WEATHER_ICON(condition)
+
+
+def format_temperature(temp: float, unit: str = "°C") -> str:
+    """
+    Format temperature value with unit
+    """
+    return f"{round(temp)}{unit}"
+
+
+def format_time(timestamp: datetime, format: str = "%H:%M") -> str:
+    """
+    Format datetime to string
+    """
+    if isinstance(timestamp, int):
+        timestamp = datetime.fromtimestamp(timestamp)
+    return timestamp.strftime(format)
+
+
+def calculate_uv_level(uv_index: float) -> str:
+    """
+    Get UV index level text
+    """
+    return UV_LEVEL(uv_index)
+
+
+def get_uv_color(uv_index: float) -> str:
+    """
+    Get color for UV index
+    """
+    return UV_COLOR(uv_index)
+
+
+def calculate_feels_like(temp, humidity, wind_speed, temp_unit: str = "°C", wind_unit: str = "km/h"):
+    """
+    Calculate feels-like temperature (NWS wind chill / heat index)
+    Works on scalars, NumPy arrays and pandas Series; see derived.py
+    """
+    from derived import apparent_temperature
+    return apparent_temperature(temp, humidity, wind_speed, temp_unit, wind_unit)
+
+
+def get_visibility_description(visibility: float) -> str:
+    """
+    Get visibility description
+    """
+    return VISIBILITY(visibility)
+
+
+def get_wind_direction(degree: float) -> str:
+    """
+    Convert wind degree to direction
+    """
+    directions = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+                  "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
+    index = round(degree / 22.5) % 16
+    return directions[index]
+
+
+def format_sunrise_sunset(timestamp: datetime) -> str:
+    """
+    Format sunrise/sunset time
+    """
+    return format_time(timestamp, "%H:%M")
+
+
+def calculate_daylight_hours(sunrise: datetime, sunset: datetime) -> float:
+    """
+    Calculate hours of daylight
+    """
+    delta = sunset - sunrise
+    return delta.total_seconds() / 3600
+
+
+def get_color_for_temp(temp: float) -> str:
+    """
+    Get color based on temperature
+    """
+    return TEMPERATURE_COLOR(temp)
+
+
+def format_decimal(value: float, decimals: int = 1) -> str:
+    """
+    Format decimal number
+    """
+    return f"{value:.{decimals}f}"
+
+
+def get_pressure_description(pressure: float) -> str:
+    """
+    Get pressure description
+    """
+    return PRESSURE(pressure)
+
+
+def get_humidity_description(humidity: float) -> str:
+    """
+    Get humidity description
+    """
+    return HUMIDITY(humidity)
+
+
+def get_forecast_icon(condition: str) -> str:
+    """
+    Get forecast icon with emoji
+    """
+    return WEATHER_ICON(condition)
+
+
+# Each unit's exact factor to a base unit; every (from, to) pair is derived
+# once below, so e.g. knots <-> mph needs no entry of its own
+_TEMPERATURE_TO_CELSIUS = {
+    "°C": (Fraction(1), Fraction(0)),
+    "°F": (Fraction(5, 9), Fraction(-160, 9)),
+    "K": (Fraction(1), Fraction(-27315, 100)),
+}
+_WIND_TO_MS = {
+    "m/s": Fraction(1),
+    "km/h": Fraction(1000, 3600),
+    "mph": Fraction(1609344, 3600000),
+    "knots": Fraction(1852, 3600),
+}
+
+# (from, to) -> (scale, offset): converted = value * scale + offset
+TEMPERATURE_CONVERSIONS = {
+    (src, dst): (float(a / c), float((b - d) / c))
+    for src, (a, b) in _TEMPERATURE_TO_CELSIUS.items()
+    for dst, (c, d) in _TEMPERATURE_TO_CELSIUS.items()
+}
+# (from, to) -> multiplier
+WIND_SPEED_CONVERSIONS = {
+    (src, dst): float(f_src / f_dst)
+    for src, f_src in _WIND_TO_MS.items()
+    for dst, f_dst in _WIND_TO_MS.items()
+}
+PRESSURE_CONVERSIONS = {
+    (src, dst): f_dst / f_src
+    for src, f_src in PRESSURE_UNITS.items()
+    for dst, f_dst in PRESSURE_UNITS.items()
+}
+
+
+def _as_numeric(value):
+    """Lists/tuples become arrays; scalars, arrays and Series pass through"""
+    if isinstance(value, (list, tuple)):
+        return np.asarray(value, dtype=float)
+    return value
+
+
+def convert_temperature(temp, from_unit: str, to_unit: str):
+    """
+    Convert temperature between units (°C, °F, K)
+    Works on scalars, NumPy arrays and pandas Series in one operation
+    """
+    if from_unit == to_unit:
+        return temp
+    conversion = TEMPERATURE_CONVERSIONS.get((from_unit, to_unit))
+    if conversion is None:
+        return temp
+    scale, offset = conversion
+    return _as_numeric(temp) * scale + offset
+
+
+def convert_wind_speed(speed, from_unit: str, to_unit: str):
+    """
+    Convert wind speed between units (m/s, km/h, mph, knots)
+    Works on scalars, NumPy arrays and pandas Series in one operation
+    """
+    if from_unit == to_unit:
+        return speed
+    factor = WIND_SPEED_CONVERSIONS.get((from_unit, to_unit))
+    if factor is None:
+        return speed
+    return _as_numeric(speed) * factor
+
+
+def convert_pressure(pressure, from_unit: str = "hPa", to_unit: str = "inHg"):
+    """
+    Convert pressure between config.PRESSURE_UNITS (hPa, mb, inHg)
+    Works on scalars, NumPy arrays and pandas Series in one operation
+    """
+    if from_unit == to_unit:
+        return pressure
+    factor = PRESSURE_CONVERSIONS.get((from_unit, to_unit))
+    if factor is None:
+        return pressure
+    return _as_numeric(pressure) * factor
+
+
+def get_air_quality_description(aqi: int) -> str:
+    """
+    Get air quality description
+    """
+    descriptions = {
+        1: "Good - Air quality is satisfactory",
+        2: "Fair - Acceptable air quality",
+        3: "Moderate - Some pollution",
+        4: "Poor - Unhealthy air",
+        5: "Very Poor - Very unhealthy air",
+    }
+    return descriptions.get(aqi, "Unknown")
+
+
+def format_location(city: str, country: str = None) -> str:
+    """
+    Format location string
+    """
+    if country:
+        return f"{city}, {country}"
+    return city
+
+
+def calculate_wind_chill(temp, wind_speed, temp_unit: str = "°C", wind_unit: str = "km/h"):
+    """
+    Calculate NWS wind chill temperature (air temperature above 10°C / below 4.8 km/h)
+    Works on scalars, NumPy arrays and pandas Series; see derived.py
+    """
+    from derived import wind_chill
+    return wind_chill(temp, wind_speed, temp_unit, wind_unit)
+
+
+def get_week_day_name(offset: int) -> str:
+    """
+    Get day name for given offset from today
+    """
+    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+    date = datetime.now() + timedelta(days=offset)
+    return days[date.weekday()]
+
+
+def get_month_name(month: int) -> str:
+    """
+    Get month name from number
+    """
+    months = ["", "January", "February", "March", "April", "May", "June",
+              "July", "August", "September", "October", "November", "December"]
+    return months[month] if 1 <= month <= 12 else ""
+
+
+def format_date_relative(date: datetime) -> str:
+    """
+    Format date as relative (e.g., "Today", "Tomorrow", "Monday")
+    """
+    today = datetime.now().date()
+    delta = (date.date() - today).days
+    
+    if delta == 0:
+        return "Today"
+    elif delta == 1:
+        return "Tomorrow"
+    elif delta == -1:
+        return "Yesterday"
+    else:
+        return date.strftime("%A")
+
+
+def format_age(seconds: float) -> str:
+    """
+    Format data age (e.g., "just now", "5 min ago", "2 h ago")
+    """
+    if seconds is None or seconds < 60:
+        return "just now"
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes} min ago"
+    return f"{minutes // 60} h ago"
+
+
+__all__ = [
+    'get_weather_icon',
+    'format_temperature',
+    'format_time',
+    'calculate_uv_level',
+    'get_uv_color',
+    'calculate_feels_like',
+    'get_visibility_description',
+    'get_wind_direction',
+    'format_sunrise_sunset',
+    'calculate_daylight_hours',
+    'get_color_for_temp',
+    'format_decimal',
+    'get_pressure_description',
+    'get_humidity_description',
+    'get_forecast_icon',
+    'convert_temperature',
+    'convert_wind_speed',
+    'convert_pressure',
+    'get_air_quality_description',
+    'format_location',
+    'calculate_wind_chill',
+    'get_week_day_name',
+    'get_month_name',
+    'format_date_relative',
+    'format_age',
+]
@@ -0,0 +1,148 @@
+"""
+Derived comfort metrics: wind chill, heat index, dew point, feels-like
+
+All functions take scalars, NumPy arrays or pandas Series (returning the
+same kind) and are unit-aware: values are converted to the units each
+formula is defined in and results come back in the caller's temperature
+unit. Unknown units raise ValueError.
+
+    NWS wind chill (2001)      T <= 50 °F and wind >= 3 mph, else T
+    NWS heat index (Rothfusz)  Steadman simple form below 80 °F, regression
+                               with low/high humidity adjustments above
+    Magnus dew point           Alduchov & Eskridge (1996) coefficients
+    Apparent temperature       wind chill, heat index or air temperature,
+                               as on weather.gov forecasts
+"""
+
+import numpy as np
+
+from core import TEMPERATURE_CONVERSIONS, WIND_SPEED_CONVERSIONS, convert_temperature, convert_wind_speed
+
+# OpenWeatherMap ``units`` parameter -> (temperature unit, wind speed unit)
+UNIT_SYSTEMS = {
+    "metric": ("°C", "m/s"),
+    "imperial": ("°F", "mph"),
+    "standard": ("K", "m/s"),
+}
+
+MAGNUS_A = 17.625
+MAGNUS_B = 243.04  # °C
+
+
+def _array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _temperature(values, from_unit: str, to_unit: str) -> np.ndarray:
+    if (from_unit, to_unit) not in TEMPERATURE_CONVERSIONS:
+        raise ValueError(f"Unknown temperature units: {from_unit!r} -> {to_unit!r}")
+    return _array(convert_temperature(_array(values), from_unit, to_unit))
+
+
+def _wind_mph(values, unit: str) -> np.ndarray:
+    if (unit, "mph") not in WIND_SPEED_CONVERSIONS:
+        raise ValueError(f"Unknown wind speed unit: {unit!r}")
+    return _array(convert_wind_speed(_array(values), unit, "mph"))
+
+
+def _restore(values, result: np.ndarray):
+    """Return ``result`` in the shape of ``values``: float, Series or array"""
+    if np.ndim(result) == 0:
+        return float(result)
+    index = getattr(values, "index", None)
+    if index is not None and hasattr(values, "to_numpy"):
+        return type(values)(result, index=index, name=getattr(values, "name", None))
+    return result
+
+
+def _wind_chill_f(temp_f: np.ndarray, wind_mph: np.ndarray) -> np.ndarray:
+    v = np.power(np.maximum(wind_mph, 0.0), 0.16)
+    chill = 35.74 + 0.6215 * temp_f - 35.75 * v + 0.4275 * temp_f * v
+    return np.where((temp_f <= 50.0) & (wind_mph >= 3.0), chill, temp_f)
+
+
+def _heat_index_f(temp_f: np.ndarray, humidity: np.ndarray) -> np.ndarray:
+    t, rh = temp_f, humidity
+    simple = 0.5 * (t + 61.0 + (t - 68.0) * 1.2 + rh * 0.094)
+    full = (-42.379 + 2.04901523 * t + 10.14333127 * rh - 0.22475541 * t * rh
+            - 6.83783e-3 * t * t - 5.481717e-2 * rh * rh + 1.22874e-3 * t * t * rh
+            + 8.5282e-4 * t * rh * rh - 1.99e-6 * t * t * rh * rh)
+    dry = (rh < 13.0) & (t >= 80.0) & (t <= 112.0)
+    spread = np.clip(17.0 - np.abs(t - 95.0), 0.0, None)
+    full = full - np.where(dry, (13.0 - rh) / 4.0 * np.sqrt(spread / 17.0), 0.0)
+    humid = (rh > 85.0) & (t >= 80.0) & (t <= 87.0)
+    full = full + np.where(humid, (rh - 85.0) / 10.0 * (87.0 - t) / 5.0, 0.0)
+    return np.where((simple + t) / 2.0 >= 80.0, full, simple)
+
+
+def _dew_point_c(temp_c: np.ndarray, humidity: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gamma = np.log(np.clip(humidity, 0.0, 100.0) / 100.0) + MAGNUS_A * temp_c / (MAGNUS_B + temp_c)
+        dew = MAGNUS_B * gamma / (MAGNUS_A - gamma)
+    # Completely dry air: the limit as humidity -> 0 is -MAGNUS_B
+    return np.where(np.isneginf(gamma), -MAGNUS_B, dew)
+
+
+def wind_chill(temp, wind_speed, temp_unit: str = "°C", wind_unit: str = "m/s"):
+    """NWS wind chill in ``temp_unit`` (air temperature where it does not apply)"""
+    temp_f = _temperature(temp, temp_unit, "°F")
+    wind_mph = _wind_mph(wind_speed, wind_unit)
+    return _restore(temp, _temperature(_wind_chill_f(temp_f, wind_mph), "°F", temp_unit))
+
+
+def heat_index(temp, humidity, temp_unit: str = "°C"):
+    """NWS (Rothfusz) heat index in ``temp_unit``; ``humidity`` in %"""
+    temp_f = _temperature(temp, temp_unit, "°F")
+    return _restore(temp, _temperature(_heat_index_f(temp_f, _array(humidity)), "°F", temp_unit))
+
+
+def dew_point(temp, humidity, temp_unit: str = "°C"):
+    """Magnus dew point in ``temp_unit``; ``humidity`` in %"""
+    temp_c = _temperature(temp, temp_unit, "°C")
+    return _restore(temp, _temperature(_dew_point_c(temp_c, _array(humidity)), "°C", temp_unit))
+
+
+def apparent_temperature(temp, humidity, wind_speed, temp_unit: str = "°C", wind_unit: str = "m/s"):
+    """
+    Feels-like temperature in ``temp_unit``: wind chill when cold and
+    windy, heat index from 80 °F, otherwise the air temperature
+    """
+    temp_f = _temperature(temp, temp_unit, "°F")
+    wind_mph = _wind_mph(wind_speed, wind_unit)
+    feels = _feels_like_f(temp_f, wind_mph, _wind_chill_f(temp_f, wind_mph),
+                          _heat_index_f(temp_f, _array(humidity)))
+    return _restore(temp, _temperature(feels, "°F", temp_unit))
+
+
+def _feels_like_f(temp_f, wind_mph, chill_f, heat_f) -> np.ndarray:
+    hot = np.where(temp_f >= 80.0, heat_f, temp_f)
+    return np.where((temp_f <= 50.0) & (wind_mph >= 3.0), chill_f, hot)
+
+
+def derive_metrics(temp, humidity, wind_speed, units: str = "metric") -> dict:
+    """
+    Every derived metric for whole columns at once, converting units a
+    single time; ``units`` is the OpenWeatherMap unit system of the inputs.
+    Returns values (in the input temperature unit) keyed "wind_chill",
+    "heat_index", "dew_point" and "feels_like".
+    """
+    if units not in UNIT_SYSTEMS:
+        raise ValueError(f"Unknown unit system: {units!r}")
+    temp_unit, wind_unit = UNIT_SYSTEMS[units]
+    temp_f = _temperature(temp, temp_unit, "°F")
+    wind_mph = _wind_mph(wind_speed, wind_unit)
+    humidity = _array(humidity)
+
+    chill = _wind_chill_f(temp_f, wind_mph)
+    heat = _heat_index_f(temp_f, humidity)
+    dew_c = _dew_point_c((temp_f - 32.0) * 5.0 / 9.0, humidity)
+
+    def back(values, unit="°F"):
+        return _restore(temp, _temperature(values, unit, temp_unit))
+
+    return {
+        "wind_chill": back(chill),
+        "heat_index": back(heat),
+        "dew_point": back(dew_c, "°C"),
+        "feels_like": back(_feels_like_f(temp_f, wind_mph, chill, heat)),
+    }
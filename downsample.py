@@ -0,0 +1,92 @@
+"""
+Server-side downsampling of long time series for charts
+
+Both selectors return sorted indices into the input, so any column can
+be taken at the kept rows and the points shown are real samples.
+
+    lttb      Largest-Triangle-Three-Buckets (Steinarsson, 2013): keeps the
+              visual shape of line charts
+    min_max   the lowest and highest sample of every bucket: keeps the
+              extremes of bar charts
+
+Bucket statistics are computed with NumPy over padded ``buckets x width``
+index matrices. LTTB's choice in each bucket depends on the previous
+choice, so that one step walks the buckets, scoring each whole bucket
+in a single vectorized expression.
+"""
+
+import numpy as np
+
+from config import DEFAULTS
+
+
+def point_budget(width_px: int = None, points_per_px: float = None) -> int:
+    """Points worth sending for a chart ``width_px`` wide"""
+    width_px = width_px or DEFAULTS["chart_width_px"]
+    points_per_px = points_per_px or DEFAULTS["chart_points_per_px"]
+    return max(int(width_px * points_per_px), DEFAULTS["chart_min_points"])
+
+
+def _numeric(values) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype.kind in "Mm":
+        values = values.view(np.int64)
+    return values.astype(np.float64, copy=False)
+
+
+def _buckets(start: int, stop: int, count: int):
+    """
+    Split ``range(start, stop)`` into ``count`` near-equal buckets:
+    returns (edges, index matrix); short rows repeat their last index
+    """
+    edges = np.linspace(start, stop, count + 1).astype(np.int64)
+    width = int(np.diff(edges).max())
+    index = edges[:-1, None] + np.arange(width)
+    return edges, np.minimum(index, edges[1:, None] - 1)
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """Indices of the ``n_out`` points LTTB keeps (all of them if n_out >= len)"""
+    x, y = _numeric(x), _numeric(y)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the interior is split into
+    # n_out - 2 buckets that each contribute one point
+    edges, index = _buckets(1, n - 1, n_out - 2)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / counts
+    avg_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / counts
+    # Third vertex: the next bucket's average (the last point for the last bucket)
+    cx = np.append(avg_x[1:], x[-1])
+    cy = np.append(avg_y[1:], y[-1])
+    bx, by = x[index], y[index]
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(len(index)):
+        ax, ay = x[a], y[a]
+        # Twice the triangle area, up to sign
+        area = np.abs((ax - cx[i]) * (by[i] - ay) - (ax - bx[i]) * (cy[i] - ay))
+        a = index[i, np.argmax(np.nan_to_num(area, nan=-1.0))]
+        kept[i + 1] = a
+    return kept
+
+
+def min_max(y, n_out: int) -> np.ndarray:
+    """
+    Indices of each bucket's minimum and maximum (``n_out // 2`` buckets),
+    in order; all of them if ``n_out >= len``
+    """
+    y = _numeric(y)
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    _, index = _buckets(0, n, n_out // 2)
+    values = y[index]
+    rows = np.arange(len(index))
+    lows = index[rows, np.argmin(np.where(np.isnan(values), np.inf, values), axis=1)]
+    highs = index[rows, np.argmax(np.where(np.isnan(values), -np.inf, values), axis=1)]
+    return np.unique(np.concatenate([lows, highs]))
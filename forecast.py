@@ -0,0 +1,81 @@
+"""
+Forecast payload parsing shared by the app, workers and benchmarks
+"""
+
+import numpy as np
+import pandas as pd
+
+from aggregation import local_utc_offset
+from models import Forecast
+
+
+# Offsets are probed this far apart; assumes no zone changes offset twice within it
+_OFFSET_PROBE_STEP = 86400
+
+
+def local_datetimes(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Unix seconds -> naive local ``datetime64[us]`` (as ``datetime.fromtimestamp``)
+
+    The local offset is probed daily across the series' range and each
+    change is pinned to the second by bisection, so every timestamp gets
+    the offset in force at that instant (also across several DST changes).
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if not len(timestamps):
+        return timestamps.astype("datetime64[us]")
+    lo, hi = int(timestamps.min()), int(timestamps.max())
+    probes = np.append(np.arange(lo, hi, _OFFSET_PROBE_STEP), hi).tolist()
+    probe_offsets = [local_utc_offset(t) for t in probes]
+
+    starts, values = [lo], [probe_offsets[0]]
+    for i in np.flatnonzero(np.diff(probe_offsets)).tolist():
+        before, after = probes[i], probes[i + 1]
+        while after - before > 1:
+            mid = (before + after) // 2
+            if local_utc_offset(mid) == probe_offsets[i]:
+                before = mid
+            else:
+                after = mid
+        starts.append(after)
+        values.append(probe_offsets[i + 1])
+
+    if len(values) == 1:
+        offsets = values[0]
+    else:
+        offsets = np.asarray(values, dtype=np.int64)[np.searchsorted(starts, timestamps, "right") - 1]
+    return (timestamps + offsets).astype("datetime64[s]").astype("datetime64[us]")
+
+
+# Forecast columns parse_forecast reads; decoding skips the rest
+PARSE_FIELDS = ("temp", "feels_like", "humidity", "wind_speed", "condition",
+                "pressure", "rain", "snow", "wind_gust")
+
+
+def parse_forecast(forecast_data):
+    """
+    Parse forecast JSON (or a decoded ``models.Forecast``) into a clean DataFrame
+
+    Columns come straight from the decoded arrays; rain/snow are 0 mm and
+    wind_gust NaN where a slot does not report them.
+    """
+    if not forecast_data:
+        return None
+    if not isinstance(forecast_data, Forecast):
+        if "list" not in forecast_data:
+            return None
+        forecast_data = Forecast.from_dict(forecast_data, PARSE_FIELDS)
+
+    f = forecast_data
+    return pd.DataFrame({
+        "datetime": local_datetimes(f.dt),
+        "temp": f.temp,
+        "feels_like": f.feels_like,
+        "humidity": f.humidity,
+        "wind_speed": f.wind_speed,
+        "description": f.condition,
+        "pressure": f.pressure,
+        "rain": f.rain,
+        "snow": f.snow,
+        "wind_gust": f.wind_gust,
+    })
@@ -0,0 +1,326 @@
+"""
+Lightweight instrumentation with Prometheus text export
+
+Upstream calls record latency histograms, status codes, retries and
+payload sizes. Caches, the rate limiter and request coalescing are
+registered once and their own counters are read at export time, so their
+hot paths carry no extra work. When disabled, every recording helper
+returns after a single flag check.
+
+    METRICS["enabled"] = True      # or WEATHERHUB_METRICS=1
+    metrics.start_http_server()    # http://127.0.0.1:9108/metrics
+    metrics.write_textfile(path)   # node_exporter textfile collector
+
+A process that cannot bind the port (another worker holds it) falls
+back to rewriting ``weatherhub.<pid>.prom`` next to METRICS["textfile"].
+"""
+
+import os
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config import METRICS
+
+enabled = bool(METRICS.get("enabled"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def enable(flag: bool = True):
+    """Turn recording on or off at runtime"""
+    global enabled
+    enabled = flag
+
+
+def _format_labels(labelnames, values) -> str:
+    if not labelnames:
+        return ""
+    pairs = []
+    for name, value in zip(labelnames, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, labels, value) for labels, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        out = []
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else repr(float(bound))
+                out.append((f"{self.name}_bucket", labels + (le,), cumulative))
+            out.append((f"{self.name}_count", labels, cumulative))
+            out.append((f"{self.name}_sum", labels, series[-1]))
+        return out
+
+    def label_names_for(self, sample_name: str):
+        return self.labelnames + ("le",) if sample_name.endswith("_bucket") else self.labelnames
+
+
+# ==================== UPSTREAM METRICS ====================
+
+UPSTREAM_LATENCY = Histogram(
+    "weatherhub_upstream_request_seconds", "Upstream HTTP request latency per attempt",
+    ("endpoint",))
+UPSTREAM_RESPONSES = Counter(
+    "weatherhub_upstream_responses_total", "Upstream responses by status code",
+    ("endpoint", "status"))
+UPSTREAM_ERRORS = Counter(
+    "weatherhub_upstream_errors_total", "Upstream attempts that failed without a response",
+    ("endpoint", "error"))
+UPSTREAM_RETRIES = Counter(
+    "weatherhub_upstream_retries_total", "Upstream retries after 429/5xx or connection errors",
+    ("endpoint",))
+UPSTREAM_PAYLOAD = Histogram(
+    "weatherhub_upstream_payload_bytes", "Upstream response body size",
+    ("endpoint",), buckets=SIZE_BUCKETS)
+
+_metrics = [UPSTREAM_LATENCY, UPSTREAM_RESPONSES, UPSTREAM_ERRORS, UPSTREAM_RETRIES, UPSTREAM_PAYLOAD]
+
+
+def record_response(endpoint: str, status: int, seconds: float, size: int):
+    """One completed upstream attempt"""
+    if not enabled:
+        return
+    UPSTREAM_LATENCY.observe(seconds, endpoint)
+    UPSTREAM_RESPONSES.inc(endpoint, str(status))
+    UPSTREAM_PAYLOAD.observe(size, endpoint)
+
+
+def record_error(endpoint: str, error: BaseException, seconds: float):
+    """One upstream attempt that raised before a response arrived"""
+    if not enabled:
+        return
+    UPSTREAM_LATENCY.observe(seconds, endpoint)
+    UPSTREAM_ERRORS.inc(endpoint, type(error).__name__)
+
+
+def record_retry(endpoint: str):
+    if not enabled:
+        return
+    UPSTREAM_RETRIES.inc(endpoint)
+
+
+# ==================== REGISTERED SOURCES ====================
+
+_sources = []  # (kind, label, weakref)
+_sources_lock = threading.Lock()
+
+# stats() key -> (metric suffix, type, help)
+_CACHE_FIELDS = {
+    "hits": ("hits_total", "counter", "Cache hits"),
+    "misses": ("misses_total", "counter", "Cache misses"),
+    "evictions": ("evictions_total", "counter", "Entries evicted for size/count limits"),
+    "expirations": ("expirations_total", "counter", "Entries removed on TTL expiry"),
+    "stale_served": ("stale_served_total", "counter", "Stale entries served"),
+    "entries": ("entries", "gauge", "Entries currently cached"),
+    "bytes": ("bytes", "gauge", "Approximate bytes cached"),
+}
+
+
+def register_cache(layer: str, cache):
+    """Export ``cache.stats()`` under ``layer``; summed across live instances"""
+    _register("cache", layer, cache)
+
+
+def register_rate_limiter(limiter):
+    _register("rate_limiter", "default", limiter)
+
+
+def register_single_flight(single_flight):
+    _register("single_flight", "default", single_flight)
+
+
+def _register(kind: str, label: str, obj):
+    with _sources_lock:
+        _sources.append((kind, label, weakref.ref(obj)))
+
+
+def _live_sources():
+    with _sources_lock:
+        _sources[:] = [s for s in _sources if s[2]() is not None]
+        return [(kind, label, ref()) for kind, label, ref in _sources]
+
+
+def _collect_sources():
+    """Aggregate registered stats into ``{(name, type, help): {labels: value}}``"""
+    families = {}
+
+    def add(name, kind, help_text, labelnames, labels, value):
+        family = families.setdefault((name, kind, help_text, labelnames), {})
+        family[labels] = family.get(labels, 0) + value
+
+    for kind, label, obj in _live_sources():
+        if obj is None:
+            continue
+        stats = obj.stats()
+        if kind == "cache":
+            for field, (suffix, metric_type, help_text) in _CACHE_FIELDS.items():
+                if field in stats:
+                    add(f"weatherhub_cache_{suffix}", metric_type, help_text, ("layer",),
+                        (label,), stats[field])
+        elif kind == "rate_limiter":
+            add("weatherhub_rate_limit_queued", "gauge", "Callers waiting for a token",
+                (), (), stats["queued"])
+            for priority, values in stats["priorities"].items():
+                add("weatherhub_rate_limit_acquired_total", "counter", "Tokens granted",
+                    ("priority",), (priority,), values["acquired"])
+                add("weatherhub_rate_limit_rejected_total", "counter",
+                    "Requests rejected after max_wait", ("priority",), (priority,), values["rejected"])
+                add("weatherhub_rate_limit_wait_seconds_total", "counter",
+                    "Total queueing delay", ("priority",), (priority,), values["wait_total"])
+        elif kind == "single_flight":
+            add("weatherhub_coalesce_executed_total", "counter", "Upstream calls executed",
+                (), (), stats["executed"])
+            add("weatherhub_coalesce_collapsed_total", "counter",
+                "Calls served by another in-flight request", (), (), stats["collapsed"])
+    return families
+
+
+# ==================== EXPORT ====================
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in _metrics:
+        samples = metric.samples()
+        if not samples:
+            continue
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in samples:
+            labelnames = (metric.label_names_for(name) if isinstance(metric, Histogram)
+                          else metric.labelnames)
+            lines.append(f"{name}{_format_labels(labelnames, labels)} {value}")
+    for (name, kind, help_text, labelnames), series in _collect_sources().items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in series.items():
+            lines.append(f"{name}{_format_labels(labelnames, labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: str = None):
+    """Atomically write the current metrics to ``path``"""
+    path = path or METRICS["textfile"]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_textfile_writer = None
+
+
+def start_textfile_writer(path: str = None, interval: float = None):
+    """Rewrite the textfile every ``interval`` seconds on a daemon thread (once per process)"""
+    global _textfile_writer
+    if _textfile_writer is None:
+        interval = interval or METRICS["textfile_interval"]
+
+        def loop():
+            while True:
+                try:
+                    write_textfile(path)
+                except OSError as e:
+                    print(f"Could not write metrics textfile: {e}")
+                time.sleep(interval)
+
+        _textfile_writer = threading.Thread(target=loop, name="metrics-textfile", daemon=True)
+        _textfile_writer.start()
+    return _textfile_writer
+
+
+def start_http_server(port: int = None, host: str = None):
+    """
+    Serve /metrics on a daemon thread (once per process)
+
+    When the port is taken (e.g. by another app process), the metrics go
+    to a per-process textfile instead and None is returned.
+    """
+    global _server
+    if _server is None and _textfile_writer is None:
+        address = (host or METRICS["host"], METRICS["port"] if port is None else port)
+        try:
+            _server = ThreadingHTTPServer(address, _MetricsHandler)
+        except OSError as e:
+            root, ext = os.path.splitext(METRICS["textfile"])
+            path = f"{root}.{os.getpid()}{ext}"
+            print(f"Metrics endpoint unavailable on {address[0]}:{address[1]} ({e}); writing {path}")
+            start_textfile_writer(path)
+            return None
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    return _server
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Local OpenWeatherMap stand-in for offline benchmarks and load tests
+
+Serves /weather, /forecast and /uvi with the same JSON shapes the app and
+WeatherAPI consume, with configurable latency, error rates and 429
+injection. In record mode requests are proxied to the real API and the
+responses saved; replay mode serves those recordings back.
+
+Point the app at it with:
+    WEATHER_API_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+from config import MOCK_SERVER, SAVED_LOCATIONS
+
+CONDITIONS = [
+    (800, "Clear", "clear sky", "01"),
+    (801, "Clouds", "few clouds", "02"),
+    (803, "Clouds", "broken clouds", "04"),
+    (500, "Rain", "light rain", "10"),
+    (501, "Rain", "moderate rain", "10"),
+    (300, "Drizzle", "light intensity drizzle", "09"),
+    (211, "Thunderstorm", "thunderstorm", "11"),
+    (600, "Snow", "light snow", "13"),
+    (701, "Mist", "mist", "50"),
+]
+
+
+def parse_latency(spec: str):
+    """
+    Build a latency sampler (seconds) from a spec in milliseconds:
+    ``fixed:50``, ``uniform:20,80``, ``normal:50,10`` or ``lognormal:50,0.5``
+    (median and shape).
+    """
+    kind, _, args = (spec or "fixed:0").partition(":")
+    values = [float(v) for v in args.split(",") if v] or [0.0]
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "normal":
+        return lambda rng: max(rng.gauss(values[0], values[1]), 0.0) / 1000
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise ValueError(f"Unknown latency distribution: {spec!r}")
+
+
+class SyntheticWeather:
+    """Deterministic fake payloads: the same city always gets the same weather"""
+
+    def __init__(self, unknown_cities=()):
+        self.unknown_cities = {c.lower() for c in unknown_cities}
+        self.coords = {loc["name"].lower(): (loc["lat"], loc["lon"]) for loc in SAVED_LOCATIONS}
+
+    @staticmethod
+    def _rng(*parts) -> random.Random:
+        return random.Random(zlib.crc32("|".join(map(str, parts)).encode()))
+
+    def _city(self, name: str):
+        key = name.strip().lower()
+        if not key or key in self.unknown_cities:
+            return None
+        rng = self._rng(key)
+        lat, lon = self.coords.get(key, (round(rng.uniform(-60, 70), 4), round(rng.uniform(-180, 180), 4)))
+        return {
+            "name": name.strip().title(),
+            "country": rng.choice(["GB", "FR", "DE", "US", "JP", "AU", "AE", "SG"]),
+            "lat": lat,
+            "lon": lon,
+            "base_temp": 25 - abs(lat) * 0.4 + rng.uniform(-5, 5),
+        }
+
+    @staticmethod
+    def _convert(temp_c: float, units: str) -> float:
+        if units == "imperial":
+            return temp_c * 9 / 5 + 32
+        if units == "standard":
+            return temp_c + 273.15
+        return temp_c
+
+    def _slot(self, city: dict, dt: int, units: str) -> dict:
+        rng = self._rng(city["name"], dt)
+        hour = time.gmtime(dt).tm_hour
+        temp = city["base_temp"] + 6 * math.sin((hour - 9) / 24 * 2 * math.pi) + rng.uniform(-2, 2)
+        humidity = int(rng.uniform(30, 95))
+        wind = round(rng.uniform(0, 12), 2)
+        code, main, description, icon = rng.choice(CONDITIONS)
+        slot = {
+            "dt": dt,
+            "main": {
+                "temp": round(self._convert(temp, units), 2),
+                "feels_like": round(self._convert(temp - wind * 0.3, units), 2),
+                "temp_min": round(self._convert(temp - rng.uniform(0, 2), units), 2),
+                "temp_max": round(self._convert(temp + rng.uniform(0, 2), units), 2),
+                "pressure": int(rng.uniform(985, 1035)),
+                "humidity": humidity,
+            },
+            "weather": [{"id": code, "main": main, "description": description,
+                         "icon": icon + ("d" if 6 <= hour < 18 else "n")}],
+            "clouds": {"all": int(rng.uniform(0, 100))},
+            "wind": {"speed": wind, "deg": int(rng.uniform(0, 360)),
+                     "gust": round(wind * rng.uniform(1, 1.8), 2)},
+            "visibility": int(rng.choice([10000, 10000, 8000, 5000, 1500])),
+        }
+        if main in ("Rain", "Drizzle", "Thunderstorm"):
+            slot["rain"] = {"3h": round(rng.uniform(0.1, 8), 2)}
+        if main == "Snow":
+            slot["snow"] = {"3h": round(rng.uniform(0.1, 5), 2)}
+        return slot
+
+    def weather(self, params: dict):
+        city = self._city(params.get("q", ""))
+        if city is None:
+            return 404, {"cod": "404", "message": "city not found"}
+        now = int(time.time()) // 600 * 600
+        slot = self._slot(city, now, params.get("units", "standard"))
+        day_start = now - now % 86400
+        return 200, {
+            "coord": {"lon": city["lon"], "lat": city["lat"]},
+            "weather": slot["weather"],
+            "base": "stations",
+            "main": slot["main"],
+            "visibility": slot["visibility"],
+            "wind": slot["wind"],
+            "clouds": slot["clouds"],
+            "dt": now,
+            "sys": {"country": city["country"], "sunrise": day_start + 6 * 3600,
+                    "sunset": day_start + 18 * 3600},
+            "timezone": 0,
+            "id": zlib.crc32(city["name"].encode()) % 10_000_000,
+            "name": city["name"],
+            "cod": 200,
+        }
+
+    def forecast(self, params: dict):
+        city = self._city(params.get("q", ""))
+        if city is None:
+            return 404, {"cod": "404", "message": "city not found"}
+        cnt = int(params.get("cnt", 40))
+        start = int(time.time()) // 10800 * 10800 + 10800
+        units = params.get("units", "standard")
+        items = []
+        for i in range(cnt):
+            slot = self._slot(city, start + i * 10800, units)
+            slot["pop"] = round(self._rng(city["name"], "pop", i).random(), 2)
+            slot["dt_txt"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(slot["dt"]))
+            items.append(slot)
+        return 200, {
+            "cod": "200",
+            "message": 0,
+            "cnt": cnt,
+            "list": items,
+            "city": {"name": city["name"], "country": city["country"],
+                     "coord": {"lat": city["lat"], "lon": city["lon"]}, "timezone": 0},
+        }
+
+    def uvi(self, params: dict):
+        try:
+            lat, lon = float(params["lat"]), float(params["lon"])
+        except (KeyError, ValueError):
+            return 400, {"cod": "400", "message": "wrong latitude or longitude"}
+        rng = self._rng(round(lat, 1), round(lon, 1), int(time.time()) // 3600)
+        value = max(0.0, 11 * math.cos(math.radians(lat)) + rng.uniform(-1, 1))
+        return 200, {"lat": lat, "lon": lon, "date_iso": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                     "date": int(time.time()), "value": round(value, 2)}
+
+
+class Recordings:
+    """Responses stored as one JSON file per (endpoint, params) in a directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, endpoint: str, params: dict) -> str:
+        stable = {k: v for k, v in params.items() if k != "appid"}
+        if "q" in stable:
+            stable["q"] = " ".join(stable["q"].split()).lower()
+        digest = hashlib.sha1(json.dumps([endpoint, sorted(stable.items())]).encode()).hexdigest()
+        return os.path.join(self.directory, f"{endpoint}-{digest[:16]}.json")
+
+    def load(self, endpoint: str, params: dict):
+        try:
+            with open(self._path(endpoint, params), encoding="utf-8") as f:
+                record = json.load(f)
+            return record["status"], record["body"]
+        except FileNotFoundError:
+            return None
+
+    def save(self, endpoint: str, params: dict, status: int, body):
+        stable = {k: v for k, v in params.items() if k != "appid"}
+        with open(self._path(endpoint, params), "w", encoding="utf-8") as f:
+            json.dump({"endpoint": endpoint, "params": stable, "status": status, "body": body}, f)
+
+
+# Endpoints SyntheticWeather serves; any other path is a 404
+SYNTHETIC_ENDPOINTS = frozenset({"weather", "forecast", "uvi"})
+
+
+class MockWeatherServer(ThreadingHTTPServer):
+    """HTTP server carrying the fault-injection and data-source settings"""
+
+    daemon_threads = True
+    request_queue_size = 256
+    verbose = False
+
+    def __init__(self, address, latency: str = "fixed:0", error_rate: float = 0.0,
+                 rate_429: float = 0.0, mode: str = "synthetic", recordings: str = None,
+                 upstream: str = None, unknown_cities=("nowhere",), seed: int = None):
+        super().__init__(address, MockRequestHandler)
+        self.sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.mode = mode
+        self.synthetic = SyntheticWeather(unknown_cities)
+        self.recordings = Recordings(recordings) if recordings else None
+        self.upstream = (upstream or MOCK_SERVER["upstream"]).rstrip("/")
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.counts = {}
+        if mode in ("record", "replay") and self.recordings is None:
+            raise ValueError(f"{mode} mode needs a recordings directory")
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def respond(self, endpoint: str, params: dict):
+        """Return ``(status, body, extra_headers)`` for a request"""
+        with self.rng_lock:
+            delay = self.sample_latency(self.rng)
+            roll = self.rng.random()
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+        if delay > 0:
+            time.sleep(delay)
+        if roll < self.rate_429:
+            return 429, {"cod": 429, "message": "Too many requests (injected)"}, {"Retry-After": "1"}
+        if roll < self.rate_429 + self.error_rate:
+            return 503, {"cod": 503, "message": "Service unavailable (injected)"}, {}
+
+        if self.mode == "replay":
+            recorded = self.recordings.load(endpoint, params)
+            if recorded is None:
+                return 404, {"cod": "404", "message": "no recording for this request"}, {}
+            return recorded[0], recorded[1], {}
+        if self.mode == "record":
+            import requests
+            response = requests.get(f"{self.upstream}/{endpoint}", params=params, timeout=10)
+            body = response.json()
+            # Transient upstream failures are passed through, not recorded
+            if response.status_code != 429 and response.status_code < 500:
+                self.recordings.save(endpoint, params, response.status_code, body)
+            return response.status_code, body, {}
+
+        if endpoint not in SYNTHETIC_ENDPOINTS:
+            return 404, {"cod": "404", "message": "Internal error"}, {}
+        status, body = getattr(self.synthetic, endpoint)(params)
+        return status, body, {}
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this Nagle plus
+    # delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        params = dict(parse_qsl(url.query))
+        status, body, headers = self.server.respond(endpoint, params)
+        payload = json.dumps(body, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **options) -> MockWeatherServer:
+    """Start a server on a daemon thread; use ``server.base_url`` and ``server.shutdown()``"""
+    server = MockWeatherServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="mock-weather-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenWeatherMap stand-in")
+    parser.add_argument("--host", default=MOCK_SERVER["host"])
+    parser.add_argument("--port", type=int, default=MOCK_SERVER["port"])
+    parser.add_argument("--latency", default=MOCK_SERVER["latency"],
+                        help="fixed:MS | uniform:LO,HI | normal:MU,SIGMA | lognormal:MEDIAN,SHAPE")
+    parser.add_argument("--error-rate", type=float, default=MOCK_SERVER["error_rate"])
+    parser.add_argument("--rate-429", type=float, default=MOCK_SERVER["rate_429"])
+    parser.add_argument("--mode", choices=["synthetic", "record", "replay"], default="synthetic")
+    parser.add_argument("--recordings", default=MOCK_SERVER["recordings"])
+    parser.add_argument("--upstream", default=MOCK_SERVER["upstream"])
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = MockWeatherServer(
+        (args.host, args.port), latency=args.latency, error_rate=args.error_rate,
+        rate_429=args.rate_429, mode=args.mode, recordings=args.recordings,
+        upstream=args.upstream, seed=args.seed,
+    )
+    server.verbose = args.verbose
+    print(f"Mock OpenWeatherMap ({args.mode}) on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
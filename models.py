@@ -0,0 +1,246 @@
+"""
+Typed OpenWeatherMap response structs with validation at decode time
+
+Payloads are checked and converted once, here; downstream code reads
+plain attributes instead of re-indexing nested dicts. ``orjson`` is used
+for decoding when installed, the stdlib ``json`` module otherwise.
+"""
+
+import json
+from itertools import repeat
+from operator import itemgetter
+
+import numpy as np
+import requests
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
+
+_EMPTY = {}
+
+
+class PayloadError(requests.exceptions.InvalidJSONError):
+    """Response body is not valid JSON or does not match the expected schema"""
+
+
+def loads(body):
+    """Decode a JSON body (bytes or str), raising PayloadError"""
+    try:
+        if orjson is not None:
+            return orjson.loads(body)
+        return json.loads(body)
+    except ValueError as e:
+        raise PayloadError(f"Invalid JSON payload: {e}") from None
+
+
+def _schema_error(kind: str, error: Exception) -> PayloadError:
+    if isinstance(error, KeyError):
+        detail = f"missing field {error.args[0]!r}"
+    else:
+        detail = str(error) or type(error).__name__
+    return PayloadError(f"Malformed {kind} payload: {detail}")
+
+
+def _optional_float(value):
+    return None if value is None else float(value)
+
+
+class CurrentWeather:
+    """Decoded /weather response"""
+
+    __slots__ = ("city", "country", "lat", "lon", "dt", "timezone", "temp", "feels_like",
+                 "temp_min", "temp_max", "pressure", "humidity", "wind_speed", "wind_deg",
+                 "wind_gust", "visibility", "clouds", "condition", "description", "icon",
+                 "sunrise", "sunset")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CurrentWeather":
+        self = cls.__new__(cls)
+        try:
+            main, wind, sys_ = data["main"], data["wind"], data.get("sys") or _EMPTY
+            weather = data["weather"][0]
+            self.city = str(data.get("name", ""))
+            self.country = str(sys_.get("country", ""))
+            self.lat = float(data["coord"]["lat"])
+            self.lon = float(data["coord"]["lon"])
+            self.dt = int(data.get("dt", 0))
+            self.timezone = int(data.get("timezone", 0))
+            self.temp = float(main["temp"])
+            self.feels_like = float(main["feels_like"])
+            self.temp_min = float(main.get("temp_min", main["temp"]))
+            self.temp_max = float(main.get("temp_max", main["temp"]))
+            self.pressure = int(main["pressure"])
+            self.humidity = int(main["humidity"])
+            self.wind_speed = float(wind.get("speed", 0))
+            self.wind_deg = _optional_float(wind.get("deg"))
+            self.wind_gust = _optional_float(wind.get("gust"))
+            self.visibility = _optional_float(data.get("visibility"))
+            self.clouds = int((data.get("clouds") or _EMPTY).get("all", 0))
+            self.condition = str(weather["main"])
+            self.description = str(weather["description"])
+            self.icon = str(weather["icon"])
+            self.sunrise = int(sys_["sunrise"]) if "sunrise" in sys_ else None
+            self.sunset = int(sys_["sunset"]) if "sunset" in sys_ else None
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise _schema_error("weather", e) from None
+        return self
+
+    @classmethod
+    def decode(cls, body) -> "CurrentWeather":
+        return cls.from_dict(loads(body))
+
+    def __repr__(self):
+        return f"CurrentWeather({self.city!r}, temp={self.temp}, condition={self.condition!r})"
+
+
+class UVIndex:
+    """Decoded /uvi response"""
+
+    __slots__ = ("lat", "lon", "value", "date")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "UVIndex":
+        self = cls.__new__(cls)
+        try:
+            self.lat = float(data["lat"])
+            self.lon = float(data["lon"])
+            self.value = float(data["value"])
+            self.date = int(data.get("date", 0))
+        except (KeyError, TypeError, ValueError) as e:
+            raise _schema_error("uvi", e) from None
+        return self
+
+    @classmethod
+    def decode(cls, body) -> "UVIndex":
+        return cls.from_dict(loads(body))
+
+    def __repr__(self):
+        return f"UVIndex({self.lat}, {self.lon}, value={self.value})"
+
+
+# Forecast array fields and their dtypes
+_FORECAST_ARRAYS = {
+    "dt": np.int64, "temp": np.float64, "feels_like": np.float64, "temp_min": np.float64,
+    "temp_max": np.float64, "pressure": np.int64, "humidity": np.int64, "wind_speed": np.float64,
+    "wind_gust": np.float64, "rain": np.float64, "snow": np.float64, "pop": np.float64,
+}
+_FORECAST_LABELS = ("condition", "description", "icon")
+FORECAST_FIELDS = (*_FORECAST_ARRAYS, *_FORECAST_LABELS)
+
+
+class Forecast:
+    """
+    Decoded /forecast response, stored column-wise
+
+    Numeric fields are parallel NumPy arrays (one element per 3-hour
+    slot); ``condition``, ``description`` and ``icon`` are lists. Optional
+    fields are 0 (rain, snow, pop) or NaN (wind_gust) where absent.
+
+    ``fields`` limits decoding to the named columns (``dt`` is always
+    decoded); the others are left as None.
+    """
+
+    __slots__ = ("city", "country", "lat", "lon", "timezone", "dt", "temp", "feels_like",
+                 "temp_min", "temp_max", "pressure", "humidity", "wind_speed", "wind_gust",
+                 "rain", "snow", "pop", "condition", "description", "icon")
+
+    @classmethod
+    def from_dict(cls, data: dict, fields=None) -> "Forecast":
+        try:
+            items, city = data["list"], data.get("city")
+        except (KeyError, TypeError, AttributeError) as e:
+            raise _schema_error("forecast", e) from None
+        return cls.from_items(items, city, fields)
+
+    @classmethod
+    def from_items(cls, items: list, city: dict = None, fields=None) -> "Forecast":
+        """Build from ``list`` slot dicts plus the payload's ``city`` block"""
+        self = cls.__new__(cls)
+        try:
+            self._set_city(city)
+            self._fill(items, FORECAST_FIELDS if fields is None else fields)
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+            raise _schema_error("forecast", e) from None
+        return self
+
+    @classmethod
+    def concat(cls, parts: list, city: dict = None) -> "Forecast":
+        """Join decoded batches in order; ``city`` overrides the batches' city info"""
+        self = cls.__new__(cls)
+        if city is not None or not parts:
+            self._set_city(city)
+        else:
+            for name in ("city", "country", "lat", "lon", "timezone"):
+                setattr(self, name, getattr(parts[-1], name))
+        for name in _FORECAST_ARRAYS:
+            arrays = [getattr(part, name) for part in parts]
+            if not arrays:
+                arrays = [np.empty(0, _FORECAST_ARRAYS[name])]
+            setattr(self, name, None if arrays[0] is None else np.concatenate(arrays))
+        for name in _FORECAST_LABELS:
+            labels = [getattr(part, name) for part in parts]
+            setattr(self, name, None if labels and labels[0] is None
+                    else [label for part in labels for label in part])
+        return self
+
+    def _set_city(self, city: dict):
+        city = city or _EMPTY
+        coord = city.get("coord") or _EMPTY
+        self.city = str(city.get("name", ""))
+        self.country = str(city.get("country", ""))
+        self.lat = _optional_float(coord.get("lat"))
+        self.lon = _optional_float(coord.get("lon"))
+        tz = city.get("timezone")
+        self.timezone = None if tz is None else int(tz)
+
+    @classmethod
+    def decode(cls, body) -> "Forecast":
+        return cls.from_dict(loads(body))
+
+    def _fill(self, items: list, fields):
+        # One C-level map pipeline per column: no Python code runs per slot
+        n = len(items)
+        fields = set(fields)
+        mains = (list(map(itemgetter("main"), items)) if fields & {"temp", "feels_like", "temp_min",
+                 "temp_max", "pressure", "humidity"} else ())
+        winds = list(map(itemgetter("wind"), items)) if fields & {"wind_speed", "wind_gust"} else ()
+        weather = (list(map(itemgetter(0), map(itemgetter("weather"), items)))
+                   if fields & set(_FORECAST_LABELS) else ())
+
+        def column(rows, field, dtype=np.float64):
+            return np.fromiter(map(itemgetter(field), rows), dtype=dtype, count=n)
+
+        def optional(rows, field, default):
+            values = map(dict.get, rows, repeat(field), repeat(default))
+            return np.fromiter(values, dtype=np.float64, count=n)
+
+        def precipitation(kind):
+            return optional(map(dict.get, items, repeat(kind), repeat(_EMPTY)), "3h", 0.0)
+
+        decoders = {
+            "temp": lambda: column(mains, "temp"),
+            "feels_like": lambda: column(mains, "feels_like"),
+            "temp_min": lambda: column(mains, "temp_min"),
+            "temp_max": lambda: column(mains, "temp_max"),
+            "pressure": lambda: column(mains, "pressure", np.int64),
+            "humidity": lambda: column(mains, "humidity", np.int64),
+            "wind_speed": lambda: column(winds, "speed"),
+            "wind_gust": lambda: optional(winds, "gust", np.nan),
+            "rain": lambda: precipitation("rain"),
+            "snow": lambda: precipitation("snow"),
+            "pop": lambda: optional(items, "pop", 0.0),
+            "condition": lambda: list(map(itemgetter("main"), weather)),
+            "description": lambda: list(map(itemgetter("description"), weather)),
+            "icon": lambda: list(map(itemgetter("icon"), weather)),
+        }
+        self.dt = column(items, "dt", np.int64)
+        for name, decode in decoders.items():
+            setattr(self, name, decode() if name in fields else None)
+
+    def __len__(self):
+        return len(self.dt)
+
+    def __repr__(self):
+        return f"Forecast({self.city!r}, slots={len(self)})"
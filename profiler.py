@@ -0,0 +1,70 @@
+"""
+Per-section timing for a Streamlit script rerun
+"""
+
+import contextlib
+import json
+import os
+import time
+from datetime import datetime
+
+from config import PROFILING
+
+_NULL_SECTION = contextlib.nullcontext()
+
+
+class RerunProfiler:
+    """
+    Times named sections of one script run
+
+    Disabled profilers hand out a shared no-op context, so leaving the
+    ``with profiler.section(...)`` blocks in place costs next to nothing.
+    """
+
+    def __init__(self, enabled: bool = None, log_path: str = None):
+        self.enabled = PROFILING["enabled"] if enabled is None else enabled
+        self.log_path = log_path or PROFILING["log_path"]
+        self.started = time.perf_counter()
+        self.sections = []  # (name, seconds) in execution order
+
+    def section(self, name: str):
+        """Context manager timing one section"""
+        if not self.enabled:
+            return _NULL_SECTION
+        return self._timed(name)
+
+    @contextlib.contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sections.append((name, time.perf_counter() - start))
+
+    @property
+    def total(self) -> float:
+        """Seconds since the run started"""
+        return time.perf_counter() - self.started
+
+    def breakdown(self) -> list:
+        """Rows of section name, milliseconds and share of the total"""
+        total = self.total
+        return [
+            {"section": name, "ms": round(seconds * 1000, 2),
+             "share": f"{seconds / total:.0%}" if total else "-"}
+            for name, seconds in self.sections
+        ]
+
+    def flush(self, **context):
+        """Append this run as one JSON line to the sample log"""
+        if not self.enabled:
+            return
+        sample = {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "total_ms": round(self.total * 1000, 2),
+            "sections": {name: round(seconds * 1000, 3) for name, seconds in self.sections},
+            **context,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(sample) + "\n")
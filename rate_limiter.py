@@ -0,0 +1,216 @@
+"""
+Token-bucket rate limiting for upstream API quota
+Interactive requests are served before background prefetch and batch jobs
+"""
+
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+import metrics
+from config import API_CONFIG
+
+# Lower value = served first
+INTERACTIVE = 0
+PREFETCH = 1
+BATCH = 2
+PRIORITY_NAMES = {INTERACTIVE: "interactive", PREFETCH: "prefetch", BATCH: "batch"}
+
+current_priority = contextvars.ContextVar("current_priority", default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def request_priority(priority: int):
+    """Run upstream calls in this block at the given priority"""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """No token could be obtained within the caller's maximum wait"""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with a priority queue of waiters
+
+    Tokens refill continuously at ``calls_per_minute / 60`` per second up
+    to ``burst``. Only the highest-priority (then oldest) waiter may take a
+    token, and non-interactive callers must leave ``reserve_interactive``
+    tokens in the bucket, so background work never starves user requests.
+    A caller that cannot be served within its ``max_wait`` is rejected
+    with RateLimitExceeded instead of sleeping until a 429.
+    """
+
+    def __init__(self, calls_per_minute: float = 60, burst: int = 10,
+                 reserve_interactive: float = 0, max_wait: dict = None):
+        self.rate = calls_per_minute / 60.0
+        self.burst = float(burst)
+        self.reserve_interactive = float(reserve_interactive)
+        self.max_wait = {INTERACTIVE: 10.0, PREFETCH: 30.0, BATCH: None}
+        if max_wait:
+            names = {name: level for level, name in PRIORITY_NAMES.items()}
+            for priority, seconds in max_wait.items():
+                self.max_wait[names.get(priority, priority)] = seconds
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._metrics = {level: {"acquired": 0, "rejected": 0, "wait_total": 0.0, "wait_max": 0.0}
+                         for level in PRIORITY_NAMES}
+
+    def _floor(self, priority: int) -> float:
+        """Tokens that must remain after a take at this priority"""
+        return 0.0 if priority == INTERACTIVE else self.reserve_interactive
+
+    def _try_take(self, priority: int):
+        """Take a token if possible; returns ``(taken, seconds_until_possible)``"""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        needed = 1.0 + self._floor(priority)
+        if self._tokens >= needed:
+            self._tokens -= 1.0
+            return True, 0.0
+        return False, (needed - self._tokens) / self.rate
+
+    def acquire(self, priority: int = None, max_wait: float = -1) -> float:
+        """
+        Block until a token is available; returns the queueing delay.
+        ``max_wait`` defaults to the per-priority limit (None = unbounded).
+        """
+        if priority is None:
+            priority = current_priority.get()
+        if max_wait == -1:
+            max_wait = self.max_wait.get(priority)
+        start = time.monotonic()
+        deadline = None if max_wait is None else start + max_wait
+        me = (priority, next(self._seq))
+
+        with self._cond:
+            heapq.heappush(self._waiters, me)
+            try:
+                while True:
+                    wait = None
+                    if self._waiters[0] == me:
+                        taken, wait = self._try_take(priority)
+                        if taken:
+                            break
+                    now = time.monotonic()
+                    remaining = None if deadline is None else deadline - now
+                    if remaining is not None and (remaining <= 0 or (wait is not None and wait > remaining)):
+                        self._record(priority, now - start, rejected=True)
+                        raise RateLimitExceeded(
+                            f"Rate limit: no API quota within {max_wait:g}s "
+                            f"for {PRIORITY_NAMES.get(priority, priority)} request")
+                    timeouts = [t for t in (wait, remaining) if t is not None]
+                    self._cond.wait(min(timeouts) if timeouts else None)
+            finally:
+                self._waiters.remove(me)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+            delay = time.monotonic() - start
+            self._record(priority, delay)
+            return delay
+
+    def _record(self, priority: int, delay: float, rejected: bool = False):
+        counts = self._metrics.setdefault(
+            priority, {"acquired": 0, "rejected": 0, "wait_total": 0.0, "wait_max": 0.0})
+        counts["rejected" if rejected else "acquired"] += 1
+        counts["wait_total"] += delay
+        counts["wait_max"] = max(counts["wait_max"], delay)
+
+    def stats(self) -> dict:
+        """Per-priority acquired/rejected counts and queueing delay"""
+        with self._cond:
+            return {
+                "queued": len(self._waiters),
+                "priorities": {PRIORITY_NAMES.get(level, str(level)): dict(counts)
+                               for level, counts in self._metrics.items()},
+            }
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket whose token count lives in a SQLite file so that several
+    processes draw from one quota. Priority ordering applies within each
+    process; the bucket itself is updated atomically across processes.
+    """
+
+    def __init__(self, path: str, name: str = "openweathermap", **options):
+        super().__init__(**options)
+        self.name = name
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS rate_limit (
+                name TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+        self._conn.execute("INSERT OR IGNORE INTO rate_limit VALUES (?, ?, ?)",
+                           (name, self.burst, time.time()))
+
+    def _try_take(self, priority: int):
+        # Called with self._cond held, so the connection is used by one thread at a time
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, updated = self._conn.execute(
+                "SELECT tokens, updated FROM rate_limit WHERE name = ?", (self.name,)).fetchone()
+            tokens = min(self.burst, tokens + max(now - updated, 0.0) * self.rate)
+            needed = 1.0 + self._floor(priority)
+            taken = tokens >= needed
+            if taken:
+                tokens -= 1.0
+            self._conn.execute("UPDATE rate_limit SET tokens = ?, updated = ? WHERE name = ?",
+                               (tokens, now, self.name))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            # SQLite may already have rolled back (e.g. a failed COMMIT);
+            # a second ROLLBACK would raise and hide the original error
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            raise
+        self._tokens = tokens
+        return (True, 0.0) if taken else (False, (needed - tokens) / self.rate)
+
+
+_default_limiter = None
+_default_lock = threading.Lock()
+
+
+def default_rate_limiter():
+    """Process-wide limiter built from API_CONFIG (None when disabled)"""
+    global _default_limiter
+    settings = API_CONFIG["openweathermap"].get("rate_limit")
+    if not settings or not settings.get("enabled", True):
+        return None
+    with _default_lock:
+        if _default_limiter is None:
+            options = dict(
+                calls_per_minute=settings.get("calls_per_minute", 60),
+                burst=settings.get("burst", 10),
+                reserve_interactive=settings.get("reserve_interactive", 0),
+                max_wait=settings.get("max_wait"),
+            )
+            if settings.get("shared_path"):
+                _default_limiter = SharedTokenBucket(settings["shared_path"], **options)
+            else:
+                _default_limiter = TokenBucket(**options)
+            metrics.register_rate_limiter(_default_limiter)
+        return _default_limiter
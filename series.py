@@ -0,0 +1,151 @@
+"""
+Array-backed forecast time series
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from aggregation import local_utc_offset
+
+
+def _label_array(values) -> np.ndarray:
+    """1-D object array (``np.array`` would build a fixed-width string array)"""
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        return values
+    out = np.empty(len(values), dtype=object)
+    out[:] = values
+    return out
+
+
+def _to_timestamp(value) -> int:
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, np.datetime64):
+        return int(value.astype("datetime64[s]").astype(np.int64))
+    return int(value)
+
+
+class ForecastSeries:
+    """
+    Forecast rows stored as parallel NumPy arrays sharing one time axis
+
+    ``timestamps`` holds Unix seconds in ascending order; ``columns`` are
+    numeric arrays and ``labels`` object arrays of strings, all of the same
+    length. Slicing (positional or by time window) returns views, so no
+    data is copied. Display strings ("day", "date") are only formatted when
+    a row is read. Rows are plain dicts, so a series can stand in for the
+    list of dicts returned before.
+    """
+
+    __slots__ = ("timestamps", "columns", "labels", "utc_offset")
+
+    def __init__(self, timestamps, columns: dict = None, labels: dict = None, utc_offset: int = 0):
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.columns = {name: np.asarray(values) for name, values in (columns or {}).items()}
+        self.labels = {name: _label_array(values) for name, values in (labels or {}).items()}
+        self.utc_offset = int(utc_offset)
+        n = len(self.timestamps)
+        for name, values in {**self.columns, **self.labels}.items():
+            if len(values) != n:
+                raise ValueError(f"Column {name!r} has {len(values)} rows, expected {n}")
+
+    @classmethod
+    def from_forecast(cls, forecast) -> "ForecastSeries":
+        """Slot-level series sharing the arrays of a decoded ``models.Forecast``"""
+        offset = forecast.timezone
+        if offset is None:
+            offset = local_utc_offset(int(forecast.dt[0])) if len(forecast) else 0
+        columns = {name: getattr(forecast, name) for name in (
+            "temp", "feels_like", "temp_min", "temp_max", "humidity", "pressure",
+            "wind_speed", "wind_gust", "rain", "snow", "pop")}
+        labels = {name: getattr(forecast, name) for name in ("condition", "icon", "description")}
+        return cls(forecast.dt, columns, labels, offset)
+
+    # ---------- slicing ----------
+
+    def _view(self, index: slice) -> "ForecastSeries":
+        view = ForecastSeries.__new__(ForecastSeries)
+        view.timestamps = self.timestamps[index]
+        view.columns = {name: values[index] for name, values in self.columns.items()}
+        view.labels = {name: values[index] for name, values in self.labels.items()}
+        view.utc_offset = self.utc_offset
+        return view
+
+    def window(self, start=None, end=None) -> "ForecastSeries":
+        """
+        Rows with ``start <= time < end`` as a zero-copy view;
+        bounds are datetimes, datetime64 or Unix seconds
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, _to_timestamp(start), "left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamps, _to_timestamp(end), "left"))
+        return self._view(slice(lo, max(lo, hi)))
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._view(key)
+        if isinstance(key, str):
+            return self.columns[key] if key in self.columns else self.labels[key]
+        return self.row(key)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __getattr__(self, name):
+        # Only reached for names that are not set: expose columns as attributes
+        if name.startswith("__") or name in ForecastSeries.__slots__:
+            raise AttributeError(name)
+        for mapping in (self.columns, self.labels):
+            if name in mapping:
+                return mapping[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def __repr__(self):
+        names = ", ".join([*self.columns, *self.labels])
+        return f"ForecastSeries(rows={len(self)}, columns=[{names}])"
+
+    # ---------- display ----------
+
+    @property
+    def tzinfo(self) -> timezone:
+        return timezone(timedelta(seconds=self.utc_offset))
+
+    def datetime_at(self, i: int) -> datetime:
+        return datetime.fromtimestamp(int(self.timestamps[i]), self.tzinfo)
+
+    def strftime(self, fmt: str) -> list:
+        """Format every row's time in the series' UTC offset"""
+        tz = self.tzinfo
+        return [datetime.fromtimestamp(ts, tz).strftime(fmt) for ts in self.timestamps.tolist()]
+
+    def row(self, i: int) -> dict:
+        """One row as a dict, with "day"/"date" display strings formatted now"""
+        dt = self.datetime_at(i)
+        row = {"day": dt.strftime("%A"), "date": dt.strftime("%d %B")}
+        for name, values in self.columns.items():
+            row[name] = values[i].item()
+        for name, values in self.labels.items():
+            row[name] = values[i]
+        return row
+
+    def to_records(self) -> list:
+        return list(self)
+
+    # ---------- conversion ----------
+
+    def local_datetimes(self) -> np.ndarray:
+        """Naive ``datetime64[s]`` wall-clock times in the series' UTC offset"""
+        return (self.timestamps + self.utc_offset).astype("datetime64[s]")
+
+    def to_frame(self):
+        """
+        DataFrame with a "datetime" column plus every column and label;
+        value arrays are handed to pandas without copying
+        """
+        import pandas as pd
+        data = {"datetime": self.local_datetimes(), **self.columns, **self.labels}
+        return pd.DataFrame(data, copy=False)
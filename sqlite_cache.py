@@ -0,0 +1,136 @@
+"""
+Persistent SQLite cache backend shared across Streamlit worker processes
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from config import DEFAULTS
+from weather_api import CacheBackend
+
+
+class SQLiteWeatherCache(CacheBackend):
+    """
+    Drop-in replacement for WeatherDataCache backed by a local SQLite file
+
+    The database runs in WAL mode so readers never block the single
+    writer and several processes can share one file. Entries carry a
+    wall-clock ``stored_at`` (monotonic clocks are not comparable across
+    processes) and an ``expires_at`` deadline; expired rows are swept at
+    most every ``sweep_interval`` seconds on write, or on demand via
+    ``sweep()``. Values must be JSON-serializable. ``namespace`` lets
+    several caches with different TTLs share one file.
+    """
+
+    def __init__(self, path: str = None, namespace: str = "default",
+                 cache_duration: int = 600, hard_duration: int = None,
+                 stale_if_error: int = 0, max_entries: int = None,
+                 sweep_interval: float = 60, busy_timeout: float = 5.0):
+        self._init_ttl(cache_duration, hard_duration, stale_if_error)
+        self.path = path or DEFAULTS["cache_path"]
+        self.namespace = namespace
+        self.max_entries = max_entries if max_entries is not None else DEFAULTS["cache_max_entries"]
+        self.sweep_interval = sweep_interval
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # One connection per cache, serialized by _lock; WAL handles
+        # concurrency between processes
+        self._conn = sqlite3.connect(self.path, timeout=busy_timeout,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS weather_cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS weather_cache_expires ON weather_cache (expires_at)")
+
+    @staticmethod
+    def _encode_key(key) -> str:
+        return key if isinstance(key, str) else json.dumps(key)
+
+    def lookup(self, key):
+        """Return ``(value, age_seconds)`` for any unexpired entry, else ``(None, None)``"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM weather_cache "
+                "WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.namespace, self._encode_key(key), now),
+            ).fetchone()
+        if row is None:
+            return None, None
+        return json.loads(row[0]), max(now - row[1], 0.0)
+
+    def set(self, key, value):
+        """Cache data with timestamp"""
+        now = time.time()
+        payload = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO weather_cache "
+                "(namespace, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, self._encode_key(key), payload, now, now + self.retention),
+            )
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+
+    def clear(self):
+        """Clear all cache entries in this namespace"""
+        with self._lock:
+            self._conn.execute("DELETE FROM weather_cache WHERE namespace = ?", (self.namespace,))
+
+    def sweep(self) -> int:
+        """Delete expired rows (all namespaces); returns rows removed"""
+        with self._lock:
+            return self._sweep(time.time())
+
+    def _sweep(self, now: float) -> int:
+        self._last_sweep = now
+        removed = self._conn.execute(
+            "DELETE FROM weather_cache WHERE expires_at <= ?", (now,)).rowcount
+        # Trim this namespace to max_entries, oldest writes first
+        removed += self._conn.execute(
+            "DELETE FROM weather_cache WHERE namespace = ? AND key IN ("
+            "  SELECT key FROM weather_cache WHERE namespace = ?"
+            "  ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_entries),
+        ).rowcount
+        return removed
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM weather_cache WHERE namespace = ? AND expires_at > ?",
+                (self.namespace, time.time()),
+            ).fetchone()[0]
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current entry count"""
+        entries = len(self)
+        with self._lock:
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_served": self.stale_served,
+            }
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,198 @@
+"""
+Incremental parsing of large JSON payloads
+
+The body is read in chunks and the elements of its ``list`` array (or of
+a top-level array) are decoded one at a time, so memory is bounded by the
+chunk size plus one batch of rows rather than by the payload size, and
+the first rows are available before the download finishes.
+
+    for batch in iter_forecast_batches(iter_file_chunks("bulk_forecast.json.gz")):
+        frame = parse_forecast(batch)
+"""
+
+import codecs
+import gzip
+import json
+import re
+
+from models import Forecast, PayloadError
+
+_WHITESPACE = " \t\n\r"
+# Characters a JSON number may still continue with, up to the buffer end
+_NUMBER_TAIL = re.compile(r"[-+.eE0-9]*\Z")
+
+
+def iter_file_chunks(path: str, chunk_size: int = 1 << 16):
+    """Read a file (gzip when it ends in ``.gz``) as a stream of byte chunks"""
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class JSONListStream:
+    """
+    Yields the elements of a JSON document's ``key`` array as they arrive
+
+    ``chunks`` is any iterable of bytes or str. For a top-level object,
+    every other top-level field is decoded into ``meta`` as it is passed
+    (fields after the array are only known once iteration finishes); a
+    top-level array is streamed element by element. Malformed or truncated
+    input, or anything but whitespace after the document, raises
+    PayloadError.
+    """
+
+    def __init__(self, chunks, key: str = "list"):
+        self.key = key
+        self.meta = {}
+        self.items_read = 0
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decode = json.JSONDecoder().raw_decode
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    # ---------- buffer ----------
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping consumed text; False at end of input"""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        try:
+            if chunk is None:
+                self._eof = True
+                text = self._text.decode(b"", final=True)
+            elif isinstance(chunk, str):
+                text = chunk
+            else:
+                text = self._text.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise PayloadError(f"Invalid JSON payload: {e}") from None
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self) -> bool:
+        """Move to the next non-whitespace character; False at end of input"""
+        while True:
+            buf, pos = self._buf, self._pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buf):
+                return True
+            if not self._fill():
+                return False
+
+    def _peek(self) -> str:
+        """Next non-whitespace character (not consumed)"""
+        if not self._skip_whitespace():
+            raise PayloadError("Truncated JSON payload")
+        return self._buf[self._pos]
+
+    def _next_char(self) -> str:
+        char = self._peek()
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Decode one complete JSON value at the cursor"""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                raise PayloadError(f"Invalid JSON payload: {e}") from None
+            # A value ending at the buffer edge may continue: a number split
+            # across chunks ("12" + "34", "1." + "5"); valid JSON always has
+            # more after a value
+            at_edge = end == len(self._buf) or (
+                type(value) in (int, float) and _NUMBER_TAIL.match(self._buf, end))
+            if at_edge and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    # ---------- structure ----------
+
+    def __iter__(self):
+        first = self._next_char()
+        if first == "[":
+            yield from self._array()
+        elif first == "{":
+            yield from self._object()
+        else:
+            raise PayloadError(f"Expected a JSON object or array, got {first!r}")
+        if self._skip_whitespace():
+            raise PayloadError(f"Invalid JSON payload: trailing data {self._buf[self._pos]!r}")
+
+    def _object(self):
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str) or self._next_char() != ":":
+                raise PayloadError("Invalid JSON payload: malformed object")
+            if key == self.key and self._peek() == "[":
+                self._pos += 1
+                yield from self._array()
+            else:
+                self.meta[key] = self._value()
+            separator = self._next_char()
+            if separator == "}":
+                return
+            if separator != ",":
+                raise PayloadError(f"Invalid JSON payload: unexpected {separator!r}")
+
+    def _array(self):
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            self.items_read += 1
+            separator = self._next_char()
+            if separator == "]":
+                return
+            if separator != ",":
+                raise PayloadError(f"Invalid JSON payload: unexpected {separator!r}")
+
+    def batches(self, size: int = 1024):
+        """Lists of up to ``size`` consecutive elements"""
+        batch = []
+        for item in self:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def iter_forecast_batches(chunks, batch_size: int = 1024, stream: JSONListStream = None):
+    """
+    Decode a /forecast-shaped body into successive ``models.Forecast``
+    batches. City info is attached when it precedes the slots; otherwise
+    it is in ``stream.meta["city"]`` once the generator is exhausted.
+    """
+    stream = stream or JSONListStream(chunks)
+    for items in stream.batches(batch_size):
+        yield Forecast.from_items(items, stream.meta.get("city"))
+
+
+def read_forecast(chunks, batch_size: int = 1024) -> Forecast:
+    """
+    Whole forecast decoded batch by batch: peak memory is the columnar
+    result plus one batch of slot dicts, never the full parsed document
+    """
+    stream = JSONListStream(chunks)
+    parts = list(iter_forecast_batches(chunks, batch_size, stream))
+    return Forecast.concat(parts, stream.meta.get("city"))
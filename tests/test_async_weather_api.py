@@ -0,0 +1,58 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_weather_api import AsyncWeatherAPI  # noqa: E402
+from mock_server import start_mock_server  # noqa: E402
+from rate_limiter import BATCH  # noqa: E402
+
+API_KEY = "secret-key"
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = start_mock_server(latency="fixed:0")
+    yield server
+    server.shutdown()
+
+
+def _get_many(server, *args, **kwargs):
+    async def run():
+        async with AsyncWeatherAPI(API_KEY, base_url=server.base_url, rate_limiter=False,
+                                   max_concurrency=4) as api:
+            return await api.get_many(*args, **kwargs)
+    return asyncio.run(run())
+
+
+def test_get_many_returns_partial_results_and_per_city_errors(server):
+    results, errors = _get_many(server, ["London", "nowhere", "Paris", "London"],
+                                days=3, uv="lazy", priority=BATCH)
+
+    assert set(results) == {"London", "Paris"}
+    for city in ("London", "Paris"):
+        assert results[city]["current"]["city"] == city
+        assert len(results[city]["forecast"]) == 3
+
+    assert set(errors) == {"nowhere"}
+    assert set(errors["nowhere"]) == {"current", "forecast"}
+    for message in errors["nowhere"].values():
+        assert message.startswith("CityNotFoundError")
+        assert API_KEY not in message
+
+
+def test_get_many_single_kind(server):
+    results, errors = _get_many(server, ["Oslo", "nowhere"], kinds=("forecast",), uv="lazy")
+    assert set(results) == {"Oslo"}
+    assert set(results["Oslo"]) == {"forecast"}
+    assert set(errors["nowhere"]) == {"forecast"}
+
+
+def test_get_many_propagates_programming_errors(server):
+    with pytest.raises(ValueError):
+        _get_many(server, ["London"], kinds=("current",), uv="sometimes")
+    with pytest.raises(ValueError):
+        _get_many(server, ["London"], kinds=("hourly",))
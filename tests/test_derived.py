@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from derived import derive_metrics, dew_point, heat_index, wind_chill  # noqa: E402
+
+
+# NWS wind chill chart (°F, mph -> °F, rounded)
+@pytest.mark.parametrize("temp, wind, expected", [
+    (0, 15, -19),
+    (30, 10, 21),
+    (-10, 25, -37),
+    (40, 5, 36),
+])
+def test_wind_chill_matches_nws_chart(temp, wind, expected):
+    assert round(wind_chill(temp, wind, "°F", "mph")) == expected
+
+
+def test_wind_chill_is_air_temperature_when_warm_or_calm():
+    assert wind_chill(60, 20, "°F", "mph") == 60
+    assert wind_chill(20, 2, "°F", "mph") == 20
+
+
+# NWS heat index chart (°F, % -> °F, rounded)
+@pytest.mark.parametrize("temp, humidity, expected", [
+    (90, 70, 106),
+    (80, 40, 80),
+    (100, 50, 118),
+    (84, 90, 98),
+    (86, 90, 105),
+])
+def test_heat_index_matches_nws_chart(temp, humidity, expected):
+    assert round(heat_index(temp, humidity, "°F")) == expected
+
+
+# Magnus formula with Alduchov & Eskridge coefficients (°C, % -> °C)
+@pytest.mark.parametrize("temp, humidity, expected", [
+    (20, 50, 9.26),
+    (30, 80, 26.17),
+    (25, 60, 16.70),
+    (-10, 70, -14.44),
+    (0, 100, 0.0),
+])
+def test_dew_point_magnus(temp, humidity, expected):
+    assert dew_point(temp, humidity) == pytest.approx(expected, abs=0.01)
+
+
+def test_units_round_trip():
+    assert wind_chill(-17.7778, 24.1402, "°C", "km/h") == pytest.approx(-28.55, abs=0.01)
+    assert heat_index(305.372, 70, "K") == pytest.approx(314.22, abs=0.01)
+
+
+def test_series_and_arrays_keep_their_kind():
+    temps = pd.Series([20.0, 30.0], index=["a", "b"], name="temp")
+    dew = dew_point(temps, [50, 80])
+    assert isinstance(dew, pd.Series)
+    assert list(dew.index) == ["a", "b"]
+    assert isinstance(wind_chill(np.array([-5.0]), np.array([5.0])), np.ndarray)
+
+
+def test_derive_metrics_matches_single_functions():
+    metrics = derive_metrics([0.0, 32.2], [50, 70], [6.7, 1.0], "metric")
+    np.testing.assert_allclose(metrics["wind_chill"], wind_chill([0.0, 32.2], [6.7, 1.0]))
+    np.testing.assert_allclose(metrics["heat_index"], heat_index([0.0, 32.2], [50, 70]))
+    np.testing.assert_allclose(metrics["dew_point"], dew_point([0.0, 32.2], [50, 70]))
+
+
+@pytest.mark.parametrize("call", [
+    lambda: wind_chill(0, 10, "C", "m/s"),
+    lambda: wind_chill(0, 10, "°C", "beaufort"),
+    lambda: heat_index(90, 70, "F"),
+    lambda: dew_point(20, 50, "celsius"),
+    lambda: derive_metrics(20, 50, 3, "nautical"),
+])
+def test_unknown_units_raise(call):
+    with pytest.raises(ValueError):
+        call()
@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from forecast import local_datetimes  # noqa: E402
+
+
+@pytest.fixture
+def london(monkeypatch):
+    monkeypatch.setenv("TZ", "Europe/London")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _expected(timestamps):
+    return np.array([datetime.fromtimestamp(t) for t in timestamps.tolist()], dtype="datetime64[us]")
+
+
+def test_local_datetimes_across_two_dst_changes(london):
+    # 2024 at 3 h steps: GMT -> BST in March, back to GMT in October
+    start = int(datetime(2024, 1, 1).timestamp())
+    timestamps = np.arange(start, start + 366 * 86400, 3 * 3600)
+    np.testing.assert_array_equal(local_datetimes(timestamps), _expected(timestamps))
+
+
+def test_local_datetimes_at_transition_seconds(london):
+    # Seconds around both 2024 transitions (01:00 UTC on 31 Mar and 27 Oct)
+    edges = [1711846800, 1729990800]
+    timestamps = np.unique(np.concatenate([np.arange(t - 2, t + 3) for t in edges]))
+    np.testing.assert_array_equal(local_datetimes(timestamps), _expected(timestamps))
+
+
+def test_local_datetimes_unsorted_and_empty(london):
+    timestamps = np.array([1729990801, 1711846799, 1720000000, 1711846800])
+    np.testing.assert_array_equal(local_datetimes(timestamps), _expected(timestamps))
+    assert len(local_datetimes(np.array([], dtype=np.int64))) == 0
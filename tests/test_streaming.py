@@ -0,0 +1,94 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import PayloadError  # noqa: E402
+from streaming import JSONListStream, read_forecast  # noqa: E402
+
+DOCUMENT = json.dumps({
+    "cod": "200",
+    "list": [
+        {"dt": 1700000000, "temp": -12.75, "big": 12345678901234567890, "exp": 1.5e-7},
+        {"name": "Zürich ☀️ 東京", "ok": True, "none": None, "nested": [[], {}, [1, [2.0]]]},
+        -0.0, 3, 'a "quoted" \\ string\n',
+    ],
+    "city": {"name": "Köln", "timezone": 3600},
+}, ensure_ascii=False).encode()
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def _read(chunks):
+    stream = JSONListStream(chunks)
+    items = list(stream)
+    return items, stream.meta
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 16])
+def test_chunk_sizes_match_json_loads(size):
+    expected = json.loads(DOCUMENT)
+    items, meta = _read(_chunks(DOCUMENT, size))
+    assert items == expected["list"]
+    assert meta == {"cod": expected["cod"], "city": expected["city"]}
+
+
+def test_multibyte_character_split_across_chunks():
+    data = json.dumps(["☀️", "é"], ensure_ascii=False).encode()
+    split = data.index("☀".encode()) + 1  # inside the 3-byte sequence
+    items, _ = _read([data[:split], data[split:]])
+    assert items == ["☀️", "é"]
+
+
+@pytest.mark.parametrize("number", ["1234", "-12.75", "1.5e-7", "6.02E+23", "0"])
+def test_number_split_across_chunks(number):
+    data = f"[{number}, {number}]".encode()
+    for split in range(1, len(data)):
+        items, _ = _read([data[:split], data[split:]])
+        assert items == json.loads(data), split
+
+
+def test_top_level_array_and_str_chunks():
+    assert list(JSONListStream(['[{"a": ', '1}, 2', ']'])) == [{"a": 1}, 2]
+
+
+@pytest.mark.parametrize("size", [1, 5, 1 << 16])
+def test_truncated_input_raises(size):
+    for end in range(len(DOCUMENT) - 1):
+        with pytest.raises(PayloadError):
+            _read(_chunks(DOCUMENT[:end], size))
+
+
+@pytest.mark.parametrize("data", [
+    b'{"list": [1]} x',
+    b'{"list": [1]}{}',
+    b'[1, 2] ]',
+    b'[1, 2],',
+])
+def test_trailing_data_raises(data):
+    with pytest.raises(PayloadError):
+        _read([data])
+
+
+def test_trailing_whitespace_is_accepted():
+    assert _read([b'[1, 2] \n\t ', b"  \r\n"])[0] == [1, 2]
+
+
+@pytest.mark.parametrize("data", [b"", b"   ", b"nul", b'{"list": [1 2]}', b'{"list" [1]}', b"1"])
+def test_malformed_input_raises(data):
+    with pytest.raises(PayloadError):
+        _read(_chunks(data, 2) or [b""])
+
+
+def test_read_forecast_byte_chunks():
+    from mock_server import SyntheticWeather
+    payload = SyntheticWeather().forecast({"q": "London", "cnt": 50, "units": "metric"})[1]
+    forecast = read_forecast(_chunks(json.dumps(payload).encode(), 7), batch_size=16)
+    assert len(forecast) == 50
+    assert forecast.dt.tolist() == [slot["dt"] for slot in payload["list"]]
+    assert forecast.city == payload["city"]["name"]
@@ -3,157 +3,770 @@ Optional: Weather API integration module
 Add your API key and uncomment to use real weather data
 """
 
+import contextvars
+import heapq
+import itertools
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+
+import numpy as np
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from datetime import datetime
 import json
 
+import metrics
+from aggregation import aggregate_daily, local_utc_offset
+from config import API_CONFIG, DEFAULTS
+from models import CurrentWeather, Forecast, UVIndex, loads
+from rate_limiter import PREFETCH, default_rate_limiter, request_priority
+from series import ForecastSeries
+from streaming import iter_forecast_batches
+
+# Status codes worth retrying: rate limited or upstream trouble
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Forecast columns parse_daily_forecast reads; decoding skips the rest
+DAILY_FIELDS = ("temp_min", "temp_max", "rain", "snow", "humidity", "wind_speed",
+                "condition", "description", "icon")
+
+
+class CityNotFoundError(requests.exceptions.HTTPError):
+    """Upstream answered 404 for a city lookup (possibly remembered)"""
+
+
+class UpstreamBackoffError(requests.exceptions.RequestException):
+    """A recent transient failure for this city is still being backed off"""
+
+
+def normalize_city(city: str) -> str:
+    """Canonical cache key for a city name: trimmed, single-spaced, lowercase"""
+    return " ".join(city.split()).lower()
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while
+    it is in flight wait and receive the same result (or exception).
+    Shared results must be treated as read-only.
+    """
+    
+    class _Call:
+        __slots__ = ("event", "result", "error")
+        
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.executed = 0
+        self.collapsed = 0
+    
+    def do(self, key, func):
+        """Run ``func()`` once per in-flight ``key`` and share its outcome"""
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = self._Call()
+                self.executed += 1
+            else:
+                self.collapsed += 1
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.event.set()
+    
+    def stats(self) -> dict:
+        """Counters: upstream executions, collapsed callers, keys in flight"""
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "collapsed": self.collapsed,
+                "in_flight": len(self._in_flight),
+            }
+
+
 class WeatherAPI:
     """
     Integration with OpenWeatherMap API
     Get free API key at: https://openweathermap.org/api
+
+    All requests go through one pooled ``requests.Session`` that is shared
+    by every thread (Streamlit runs each rerun on a fresh thread, so
+    thread-local sessions would never reuse a connection). The session
+    refuses cookies, which leaves it stateless and safe to share.
     """
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_url: str = None, pool_size: int = None,
+                 max_retries: int = None, backoff_factor: float = None,
+                 keep_alive: bool = None, coalesce: bool = None, uv_cache=None,
+                 rate_limiter=None):
+        settings = API_CONFIG["openweathermap"]
         self.api_key = api_key
-        self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.base_url = (base_url or settings["base_url"]).rstrip("/")
+        self.timeout = settings.get("timeout", 5)
+        self.timeouts = dict(settings.get("timeouts", {}))
+        self.connect_timeout = settings.get("connect_timeout", self.timeout)
+        self.pool_size = pool_size if pool_size is not None else settings.get("pool_size", 10)
+        self.max_retries = max_retries if max_retries is not None else settings.get("max_retries", 3)
+        self.backoff_factor = (backoff_factor if backoff_factor is not None
+                               else settings.get("backoff_factor", 0.5))
+        self.backoff_max = settings.get("backoff_max", 8)
+        self.keep_alive = keep_alive if keep_alive is not None else settings.get("keep_alive", True)
+        # Quota is per API key, so by default all clients share one bucket;
+        # pass rate_limiter=False to bypass it
+        self.rate_limiter = (default_rate_limiter() if rate_limiter is None
+                             else rate_limiter or None)
+        coalesce = coalesce if coalesce is not None else settings.get("coalesce_requests", True)
+        self.single_flight = SingleFlight() if coalesce else None
+        self.uv_grid_decimals = settings.get("uv_grid_decimals", 1)
+        # Any CacheBackend works here, e.g. a shared SQLiteWeatherCache
+        self.uv_cache = uv_cache if uv_cache is not None else WeatherDataCache(
+            cache_duration=settings.get("uv_cache_duration", 3600))
+        self._coords = WeatherDataCache(cache_duration=settings.get("coords_cache_duration", 86400))
+        negative_max = settings.get("negative_cache_max_entries", 4096)
+        self.not_found_cache = WeatherDataCache(
+            cache_duration=settings.get("not_found_cache_duration", 300), max_entries=negative_max)
+        self.failure_cache = WeatherDataCache(
+            cache_duration=settings.get("failure_backoff_duration", 30), max_entries=negative_max)
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._uv_executor = None
+        self._uv_pending = {}  # UV grid key -> Future of a background lookup
+        self._uv_pending_lock = threading.Lock()
+        
+        if uv_cache is None:
+            metrics.register_cache("uv", self.uv_cache)
+        metrics.register_cache("not_found", self.not_found_cache)
+        metrics.register_cache("failure_backoff", self.failure_cache)
+        if self.single_flight is not None:
+            metrics.register_single_flight(self.single_flight)
+
+    # ---------- session layer ----------
+
+    @property
+    def session(self) -> requests.Session:
+        """Lazily create the shared pooled session"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+
+    def _build_session(self) -> requests.Session:
+        """Create a session with a bounded keep-alive connection pool"""
+        session = requests.Session()
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        # Retries are handled in _request so they can be jittered
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size,
+                              max_retries=0, pool_block=True)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self):
+        """Close pooled connections"""
+        with self._session_lock:
+            if self._uv_executor is not None:
+                self._uv_executor.shutdown(wait=False)
+                self._uv_executor = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _backoff(self, attempt: int, retry_after: float = None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when given"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response) -> float:
+        """Parse a numeric Retry-After header"""
+        value = response.headers.get("Retry-After")
+        try:
+            return max(float(value), 0.0) if value is not None else None
+        except ValueError:
+            return None
+
+    def _request(self, endpoint: str, params: dict) -> dict:
+        """
+        GET ``{base_url}/{endpoint}`` and return the decoded JSON body.
+        Identical concurrent requests share one upstream call.
+        """
+        if self.single_flight is None:
+            return self._send(endpoint, params)
+        # City lookups are case/whitespace-insensitive upstream
+        key_params = {**params, "q": normalize_city(params["q"])} if "q" in params else params
+        key = (endpoint, tuple(sorted(key_params.items())))
+        return self.single_flight.do(key, lambda: self._send(endpoint, params))
+
+    def _send(self, endpoint: str, params: dict) -> dict:
+        """
+        Perform the GET and return the decoded JSON body;
+        raises ``requests.exceptions.RequestException`` once retries run out.
+        """
+        return loads(self._get(endpoint, params).content)
+
+    def _get(self, endpoint: str, params: dict, stream: bool = False) -> requests.Response:
+        """
+        Perform the GET, retrying 429/5xx responses and connection errors,
+        and return the successful response. With ``stream`` the body is
+        left unread; the caller must close the response.
+        """
+        url = f"{self.base_url}/{endpoint}"
+        params = {**params, "appid": self.api_key}
+        timeout = (self.connect_timeout, self.timeouts.get(endpoint, self.timeout))
         
-    def get_current_weather(self, city: str, units: str = "metric"):
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                metrics.record_error(endpoint, e, time.perf_counter() - started)
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                size = int(response.headers.get("Content-Length", 0)) if stream else len(response.content)
+                metrics.record_response(endpoint, response.status_code,
+                                        time.perf_counter() - started, size)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    try:
+                        response.raise_for_status()
+                    except requests.exceptions.HTTPError:
+                        response.close()
+                        raise
+                    return response
+                retry_after = self._retry_after(response)
+                response.close()
+            metrics.record_retry(endpoint)
+            time.sleep(self._backoff(attempt, retry_after))
+
+    def _city_request(self, endpoint: str, city: str, params: dict, send=None):
+        """
+        ``_request`` (or ``send(endpoint, params)``) for city lookups,
+        consulting the negative caches first. Raises CityNotFoundError for
+        known-unknown cities and UpstreamBackoffError while a recent
+        transient failure is backed off.
+        """
+        key = normalize_city(city)
+        if self.not_found_cache.get(key) is not None:
+            raise CityNotFoundError(f"City '{city}' not found")
+        failure = self.failure_cache.get(key)
+        if failure is not None:
+            raise UpstreamBackoffError(f"Backing off after recent failure: {failure}")
+        
+        try:
+            return (send or self._request)(endpoint, params)
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status == 404:
+                self.not_found_cache.set(key, True)
+                raise CityNotFoundError(f"City '{city}' not found", response=e.response) from e
+            if status in RETRY_STATUS_CODES:
+                self.failure_cache.set(key, f"HTTP {status}")
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            self.failure_cache.set(key, type(e).__name__)
+            raise
+
+    # ---------- raw endpoint access ----------
+
+    def fetch_current_weather(self, city: str, units: str = "metric") -> dict:
+        """Raw /weather payload; raises RequestException on failure"""
+        return self._city_request("weather", city, {"q": city, "units": units})
+
+    def fetch_forecast(self, city: str, units: str = "metric", cnt: int = None) -> dict:
+        """Raw /forecast payload; raises RequestException on failure"""
+        params = {"q": city, "units": units}
+        if cnt is not None:
+            params["cnt"] = cnt
+        return self._city_request("forecast", city, params)
+
+    def stream_forecast(self, city: str, units: str = "metric", cnt: int = None,
+                        batch_size: int = 1024, chunk_size: int = 1 << 16):
+        """
+        Yield /forecast slots as ``models.Forecast`` batches while the body
+        downloads; raises RequestException on failure, with the same
+        not-found / backoff handling as ``fetch_forecast``. Each call opens
+        its own response: a streamed body cannot be shared by single-flight.
+        """
+        params = {"q": city, "units": units}
+        if cnt is not None:
+            params["cnt"] = cnt
+        response = self._city_request("forecast", city, params,
+                                      send=lambda endpoint, p: self._get(endpoint, p, stream=True))
+        try:
+            yield from iter_forecast_batches(response.iter_content(chunk_size), batch_size)
+        finally:
+            response.close()
+
+    def fetch_uv_index(self, lat: float, lon: float) -> dict:
+        """Raw /uvi payload; raises RequestException on failure"""
+        return self._request("uvi", {"lat": lat, "lon": lon})
+
+    # ---------- parsed helpers ----------
+    
+    def parse_current_weather(self, data, uv_index: int = None) -> dict:
+        """
+        Shape a /weather payload (raw dict or decoded CurrentWeather)
+        into the current-conditions dict
+        """
+        if not isinstance(data, CurrentWeather):
+            data = CurrentWeather.from_dict(data)
+        return {
+            "city": data.city,
+            "country": data.country,
+            "temp": round(data.temp),
+            "feels_like": round(data.feels_like),
+            "humidity": data.humidity,
+            "pressure": data.pressure,
+            "wind_speed": round(data.wind_speed),
+            "visibility": round(data.visibility / 1000) if data.visibility is not None else None,
+            "condition": data.condition,
+            "description": data.description,
+            "icon": data.icon,
+            "clouds": data.clouds,
+            "sunrise": datetime.fromtimestamp(data.sunrise) if data.sunrise is not None else None,
+            "sunset": datetime.fromtimestamp(data.sunset) if data.sunset is not None else None,
+            "uv_index": uv_index,
+            "lat": data.lat,
+            "lon": data.lon,
+        }
+    
+    def parse_daily_forecast(self, data, days: int = 5) -> ForecastSeries:
+        """
+        Reduce a /forecast payload (raw dict or decoded Forecast) to one
+        row per local day, as a ForecastSeries (iterating it yields dicts).
+
+        Days follow the city's UTC offset (``city.timezone``; the machine's
+        offset when absent). Each day aggregates all of its slots: high/low
+        are the extremes of temp_max/temp_min, precipitation sums rain and
+        snow, humidity is the mean, wind the maximum, and the condition is
+        the one reported by most slots.
+        """
+        if not isinstance(data, Forecast):
+            data = Forecast.from_dict(data, DAILY_FIELDS)
+        
+        offset = data.timezone
+        if offset is None:
+            offset = local_utc_offset(int(data.dt[0])) if len(data) else 0
+        
+        daily = aggregate_daily(
+            data.dt,
+            temp_max=data.temp_max,
+            temp_min=data.temp_min,
+            precipitation=data.rain + data.snow,
+            humidity=data.humidity,
+            wind_speed=data.wind_speed,
+            conditions=data.condition,
+            utc_offset=offset,
+        )
+        
+        keep = slice(0, days)
+        slots = daily['representative'][keep]
+        labels = {name: np.asarray(getattr(data, name), dtype=object)[slots]
+                  for name in ("condition", "icon", "description")}
+        return ForecastSeries(
+            daily['first_timestamp'][keep],
+            columns={
+                "high": np.rint(daily['high'][keep]).astype(np.int64),
+                "low": np.rint(daily['low'][keep]).astype(np.int64),
+                "humidity": np.rint(daily['humidity'][keep]).astype(np.int64),
+                "wind_speed": np.rint(daily['wind_speed'][keep]).astype(np.int64),
+                "precipitation": np.round(daily['precipitation'][keep], 2),
+            },
+            labels=labels,
+            utc_offset=offset,
+        )
+    
+    def load_current_weather(self, city: str, units: str = "metric", uv: str = "eager") -> dict:
+        """
+        Fetch and shape current weather; raises RequestException on failure.
+
+        ``uv="eager"`` fills ``uv_index``: from the UV cache when possible,
+        otherwise concurrently with the weather call once the city's
+        coordinates are known (sequentially only on a city's first lookup).
+        ``uv="lazy"`` never issues a UV request; ``uv_index`` is taken from
+        the cache or left as None, and callers can fetch it later with
+        ``get_uv_index(result["lat"], result["lon"])``.
+        """
+        if uv not in ("eager", "lazy"):
+            raise ValueError(f"Unknown uv mode: {uv!r}")
+        
+        coords_key = normalize_city(city)
+        coords = self._coords.get(coords_key)
+        uv_future = None
+        if uv == "eager" and coords is not None and self._cached_uv(*coords) is None:
+            uv_future = self._submit_uv(*coords)
+        
+        data = CurrentWeather.from_dict(self.fetch_current_weather(city, units))
+        lat, lon = data.lat, data.lon
+        self._coords.set(coords_key, (lat, lon))
+        
+        if uv_future is not None:
+            uv_index = uv_future.result()
+        elif uv == "eager":
+            uv_index = self.get_uv_index(lat, lon)
+        else:
+            uv_index = self._cached_uv(lat, lon)
+        return self.parse_current_weather(data, uv_index)
+    
+    def get_current_weather(self, city: str, units: str = "metric", uv: str = "eager"):
         """
         Get current weather data for a city
         """
         try:
-            endpoint = f"{self.base_url}/weather"
-            params = {
-                "q": city,
-                "appid": self.api_key,
-                "units": units
-            }
-            
-            response = requests.get(endpoint, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            
-            return {
-                "city": data['name'],
-                "country": data['sys']['country'],
-                "temp": round(data['main']['temp']),
-                "feels_like": round(data['main']['feels_like']),
-                "humidity": data['main']['humidity'],
-                "pressure": data['main']['pressure'],
-                "wind_speed": round(data['wind']['speed']),
-                "visibility": round(data['visibility'] / 1000),
-                "condition": data['weather'][0]['main'],
-                "description": data['weather'][0]['description'],
-                "icon": data['weather'][0]['icon'],
-                "clouds": data['clouds']['all'],
-                "sunrise": datetime.fromtimestamp(data['sys']['sunrise']),
-                "sunset": datetime.fromtimestamp(data['sys']['sunset']),
-                "uv_index": self._get_uv_index(data['coord']['lat'], data['coord']['lon']),
-            }
+            return self.load_current_weather(city, units, uv)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching weather data: {e}")
             return None
     
+    def load_forecast(self, city: str, days: int = 5, units: str = "metric") -> ForecastSeries:
+        """
+        Fetch and aggregate the daily forecast; raises RequestException on failure
+        """
+        # 8 forecasts per day (3-hour intervals); one extra day so the last
+        # requested day is complete even when today is partial.
+        # The 5-day endpoint returns at most 40 slots.
+        data = self.fetch_forecast(city, units, cnt=min((days + 1) * 8, 40))
+        return self.parse_daily_forecast(data, days)
+    
     def get_forecast(self, city: str, days: int = 5, units: str = "metric"):
         """
         Get forecast data for a city
         """
         try:
-            endpoint = f"{self.base_url}/forecast"
-            params = {
-                "q": city,
-                "appid": self.api_key,
-                "units": units,
-                "cnt": days * 8  # 8 forecasts per day (3-hour intervals)
-            }
-            
-            response = requests.get(endpoint, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            
-            forecast_list = []
-            seen_days = set()
-            
-            for item in data['list']:
-                dt = datetime.fromtimestamp(item['dt'])
-                day = dt.date()
-                
-                if day not in seen_days and len(forecast_list) < days:
-                    seen_days.add(day)
-                    forecast_list.append({
-                        "day": dt.strftime("%A"),
-                        "date": dt.strftime("%d %B"),
-                        "high": round(item['main']['temp_max']),
-                        "low": round(item['main']['temp_min']),
-                        "condition": item['weather'][0]['main'],
-                        "icon": item['weather'][0]['icon'],
-                        "description": item['weather'][0]['description'],
-                        "humidity": item['main']['humidity'],
-                        "wind_speed": round(item['wind']['speed']),
-                        "precipitation": item.get('rain', {}).get('3h', 0),
-                    })
-            
-            return forecast_list
+            return self.load_forecast(city, days, units)
         except requests.exceptions.RequestException as e:
             print(f"Error fetching forecast data: {e}")
             return []
     
+    def _uv_key(self, lat: float, lon: float) -> str:
+        """UV cache key on a rounded lat/lon grid so nearby cities share it"""
+        d = self.uv_grid_decimals
+        return f"{round(lat, d):.{d}f},{round(lon, d):.{d}f}"
+    
+    def _cached_uv(self, lat: float, lon: float):
+        """UV index from cache, or None"""
+        return self.uv_cache.get(self._uv_key(lat, lon))
+    
+    def _submit_uv(self, lat: float, lon: float):
+        """Start a UV lookup in the background"""
+        with self._session_lock:
+            if self._uv_executor is None:
+                self._uv_executor = ThreadPoolExecutor(max_workers=max(1, self.pool_size // 2),
+                                                       thread_name_prefix="uv-index")
+            executor = self._uv_executor
+        # Carry the caller's request priority into the worker thread
+        return executor.submit(contextvars.copy_context().run, self.get_uv_index, lat, lon)
+    
+    def peek_uv_index(self, lat: float, lon: float):
+        """
+        UV index from cache without waiting: on a miss, a lookup is started
+        on the UV executor (one per grid cell at a time) and None is
+        returned; a later call picks up the result
+        """
+        cached = self._cached_uv(lat, lon)
+        if cached is not None:
+            return cached
+        key = self._uv_key(lat, lon)
+        with self._uv_pending_lock:
+            if key in self._uv_pending or self.failure_cache.get(f"uv:{key}") is not None:
+                return None
+            future = self._uv_pending[key] = self._submit_uv(lat, lon)
+        # Outside the lock: the callback runs right here if the lookup already finished
+        future.add_done_callback(lambda done: self._forget_uv_lookup(key, done))
+        return None
+    
+    def _forget_uv_lookup(self, key: str, future):
+        with self._uv_pending_lock:
+            if self._uv_pending.get(key) is future:
+                del self._uv_pending[key]
+    
     def get_uv_index(self, lat: float, lon: float):
         """
-        Get UV index for a location
+        Get UV index for a location (None if unavailable). Failures are
+        remembered in ``failure_cache``, so a failing lookup is not retried
+        until the backoff expires.
         """
+        key = self._uv_key(lat, lon)
+        cached = self.uv_cache.get(key)
+        if cached is not None:
+            return cached
+        failure_key = f"uv:{key}"
+        if self.failure_cache.get(failure_key) is not None:
+            return None
         try:
-            endpoint = f"{self.base_url}/uvi"
-            params = {
-                "lat": lat,
-                "lon": lon,
-                "appid": self.api_key
-            }
-            
-            response = requests.get(endpoint, params=params, timeout=5)
-            response.raise_for_status()
-            data = response.json()
+            data = UVIndex.from_dict(self.fetch_uv_index(lat, lon))
             
-            return round(data['value'])
+            value = round(data.value)
+            self.uv_cache.set(key, value)
+            return value
         except requests.exceptions.RequestException as e:
+            self.failure_cache.set(failure_key, type(e).__name__)
             print(f"Error fetching UV index: {e}")
-            return 0
-    
-    def _get_uv_index(self, lat: float, lon: float):
-        """Internal method to get UV index"""
-        return self.get_uv_index(lat, lon)
+            return None
 
 
-class WeatherDataCache:
+def approx_size(value, _depth: int = 0) -> int:
+    """
+    Rough in-memory size of a JSON-like value (or decoded model) in bytes
     """
-    Simple caching system for weather data
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (0 if value.base is None else value.nbytes)
+    size = sys.getsizeof(value)
+    if _depth >= 8:
+        return size
+    if hasattr(value, "__slots__"):
+        return size + sum(approx_size(getattr(value, name, None), _depth + 1)
+                          for name in value.__slots__)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += approx_size(k, _depth + 1) + approx_size(v, _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for v in value:
+            size += approx_size(v, _depth + 1)
+    return size
+
+
+class CacheBackend:
+    """
+    Shared TTL semantics for weather caches
+
+    Subclasses provide ``lookup(key) -> (value, age)``, ``set`` and
+    ``clear`` and a ``_lock``; ``get`` and the stale-while-revalidate
+    ``get_or_refresh`` are built on top of those.
     """
     
-    def __init__(self, cache_duration: int = 600):  # 10 minutes default
-        self.cache = {}
+    def _init_ttl(self, cache_duration: int, hard_duration: int = None, stale_if_error: int = 0):
         self.cache_duration = cache_duration
-        self.timestamps = {}
+        self.hard_duration = max(hard_duration or cache_duration, cache_duration)
+        self.stale_if_error = stale_if_error
+        self.retention = self.hard_duration + stale_if_error
+        self.hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self._refreshing = set()
+        self._refresher = None
     
     def get(self, key: str):
         """Get cached data if still valid"""
-        if key in self.cache:
-            elapsed = (datetime.now() - self.timestamps[key]).total_seconds()
-            if elapsed < self.cache_duration:
-                return self.cache[key]
-            else:
-                del self.cache[key]
-                del self.timestamps[key]
-        return None
+        value, age = self.lookup(key)
+        with self._lock:
+            if age is None or age >= self.cache_duration:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return value
+    
+    def get_or_refresh(self, key: str, loader):
+        """
+        Return ``(value, age_seconds)``, calling ``loader()`` as needed.
+
+        Fresh entries are returned as-is. Between the soft and hard TTL the
+        cached value is returned immediately and ``loader`` runs in the
+        background. Past the hard TTL ``loader`` runs inline; if it raises
+        and a stale entry is still retained, that entry is returned instead.
+        A freshly loaded value has age 0.
+        """
+        value, age = self.lookup(key)
+        if age is not None and age < self.cache_duration:
+            with self._lock:
+                self.hits += 1
+            return value, age
+        if age is not None and age < self.hard_duration:
+            with self._lock:
+                self.hits += 1
+                self.stale_served += 1
+            self._refresh_in_background(key, loader)
+            return value, age
+        
+        with self._lock:
+            self.misses += 1
+        try:
+            fresh = loader()
+        except Exception:
+            if age is None:
+                raise
+            with self._lock:
+                self.stale_served += 1
+            return value, age
+        self.set(key, fresh)
+        return fresh, 0.0
+    
+    def _refresh_in_background(self, key, loader):
+        """Run at most one background refresh per key"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+            refresher = self._refresher
+        
+        def refresh():
+            try:
+                # Revalidation is prefetch work: user requests keep priority for tokens
+                with request_priority(PREFETCH):
+                    self.set(key, loader())
+            except Exception as e:
+                print(f"Background refresh failed for {key!r}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+        
+        refresher.submit(refresh)
+
+
+class WeatherDataCache(CacheBackend):
+    """
+    Bounded LRU cache with TTL expiry for weather data
+
+    Entries are evicted least-recently-used first once ``max_entries`` or
+    the approximate ``max_bytes`` budget is exceeded. Expiry uses a
+    monotonic clock and a min-heap of deadlines that is drained on every
+    operation, so expired entries leave even if never read again. Each
+    entry is pushed once per ``set`` and popped once, keeping purging
+    amortized O(1) per operation. Safe to share between threads.
+
+    ``get`` only returns entries younger than ``cache_duration``. Setting
+    ``hard_duration`` and/or ``stale_if_error`` keeps entries around for
+    ``get_or_refresh`` (stale-while-revalidate and stale-if-error).
+    """
+    
+    def __init__(self, cache_duration: int = 600, max_entries: int = None,
+                 max_bytes: int = None, sizeof=approx_size,
+                 hard_duration: int = None, stale_if_error: int = 0):  # 10 minutes default
+        self._init_ttl(cache_duration, hard_duration, stale_if_error)
+        self.max_entries = max_entries if max_entries is not None else DEFAULTS["cache_max_entries"]
+        self.max_bytes = max_bytes if max_bytes is not None else DEFAULTS["cache_max_bytes"]
+        self.sizeof = sizeof
+        self._entries = OrderedDict()  # key -> (value, expires_at, size, stored_at), LRU order
+        self._deadlines = []  # heap of (expires_at, seq, key)
+        self._seq = itertools.count()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+    
+    def lookup(self, key: str):
+        """Return ``(value, age_seconds)`` for any retained entry, else ``(None, None)``"""
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            self._entries.move_to_end(key)
+            return entry[0], now - entry[3]
     
     def set(self, key: str, value):
         """Cache data with timestamp"""
-        self.cache[key] = value
-        self.timestamps[key] = datetime.now()
+        size = self.sizeof(value) if self.max_bytes else 0
+        with self._lock:
+            now = time.monotonic()
+            self._purge_expired(now)
+            self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                return
+            expires_at = now + self.retention
+            self._entries[key] = (value, expires_at, size, now)
+            self._bytes += size
+            heapq.heappush(self._deadlines, (expires_at, next(self._seq), key))
+            self._evict_over_budget()
+            self._compact_deadlines()
     
     def clear(self):
         """Clear all cache"""
-        self.cache.clear()
-        self.timestamps.clear()
+        with self._lock:
+            self._entries.clear()
+            self._deadlines.clear()
+            self._bytes = 0
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters and current footprint"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stale_served": self.stale_served,
+            }
+    
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+        return entry
+    
+    def _purge_expired(self, now: float):
+        """Drop every entry whose deadline has passed"""
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now:
+            expires_at, _, key = heapq.heappop(deadlines)
+            entry = self._entries.get(key)
+            # Skip heap records superseded by a later set() of the same key
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                self.expirations += 1
+    
+    def _evict_over_budget(self):
+        """Evict least-recently-used entries until within limits"""
+        while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes and self._bytes > self.max_bytes)):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry[2]
+            self.evictions += 1
+    
+    def _compact_deadlines(self):
+        """Rebuild the heap when stale records dominate it"""
+        if len(self._deadlines) > 2 * len(self._entries) + 64:
+            self._deadlines = [(entry[1], next(self._seq), key)
+                               for key, entry in self._entries.items()]
+            heapq.heapify(self._deadlines)
 
 
 # Usage example in app.py: